@@ -0,0 +1,129 @@
+// Decoder for the compact ASCII grid wire format (python/core/wire_format.py).
+// Builds the same text/HTML the Python renderer would have sent.
+const zlib = require("zlib");
+
+const MAGIC = "ASCG";
+const VERSION = 1;
+const HEADER_SIZE = 16;
+
+const FLAG_COLORED = 1;
+const FLAG_TRANSPARENT = 2;
+const FLAG_MERGE_SPANS = 4;
+
+const TRANSPARENT_CELL = 255;
+
+function readSection(buffer, offset) {
+  const length = buffer.readUInt32LE(offset);
+  const start = offset + 4;
+  return [buffer.subarray(start, start + length), start + length];
+}
+
+function readIndex(buffer, size, position) {
+  if (size === 1) return buffer[position];
+  if (size === 2) return buffer.readUInt16LE(position * 2);
+  return buffer.readUInt32LE(position * 4);
+}
+
+function decodeGrid(payload) {
+  const raw = zlib.inflateSync(Buffer.from(payload, "base64"));
+  if (raw.toString("latin1", 0, 4) !== MAGIC || raw[4] !== VERSION) {
+    throw new Error("Not a compact ASCII grid payload");
+  }
+  const flags = raw[5];
+  const indexSize = raw[6];
+  const width = raw.readUInt32LE(8);
+  const height = raw.readUInt32LE(12);
+
+  let offset = HEADER_SIZE;
+  let chars, palette, cells, colorIndices;
+  [chars, offset] = readSection(raw, offset);
+  [palette, offset] = readSection(raw, offset);
+  [cells, offset] = readSection(raw, offset);
+  [colorIndices, offset] = readSection(raw, offset);
+
+  return {
+    chars: Array.from(chars.toString("utf8")),
+    palette,
+    cells,
+    colorIndices,
+    indexSize,
+    width,
+    height,
+    colored: Boolean(flags & FLAG_COLORED),
+    transparent: Boolean(flags & FLAG_TRANSPARENT),
+    mergeSpans: Boolean(flags & FLAG_MERGE_SPANS),
+  };
+}
+
+function gridToText(grid) {
+  const { chars, palette, cells, colorIndices, indexSize, width, height } = grid;
+  // One opening tag per palette entry, built once
+  const openTags = [];
+  for (let i = 0; i < palette.length; i += 3) {
+    openTags.push(
+      `<span style="color:rgb(${palette[i]},${palette[i + 1]},${palette[i + 2]})">`
+    );
+  }
+
+  const rows = new Array(height);
+  for (let y = 0; y < height; y++) {
+    const parts = [];
+    let open = -1; // palette index of the span currently open (merged mode)
+    for (let x = 0; x < width; x++) {
+      const position = y * width + x;
+      const cell = cells[position];
+      if (grid.transparent && cell === TRANSPARENT_CELL) {
+        if (open !== -1) {
+          parts.push("</span>");
+          open = -1;
+        }
+        parts.push(" ");
+        continue;
+      }
+      if (!grid.colored) {
+        parts.push(chars[cell]);
+        continue;
+      }
+      const color = readIndex(colorIndices, indexSize, position);
+      if (!grid.mergeSpans) {
+        parts.push(openTags[color], chars[cell], "</span>");
+        continue;
+      }
+      if (color !== open) {
+        if (open !== -1) parts.push("</span>");
+        parts.push(openTags[color]);
+        open = color;
+      }
+      parts.push(chars[cell]);
+    }
+    if (open !== -1) parts.push("</span>");
+    rows[y] = parts.join("");
+  }
+  return rows.join("\n");
+}
+
+function decodeToText(payload) {
+  return gridToText(decodeGrid(payload));
+}
+
+// Replace packed grids in a Python message with text/HTML, in place
+function expandCompactMessage(message) {
+  const expandEntry = (entry) => {
+    if (!entry || entry.encoding !== "compact") return;
+    entry.ascii = entry.ascii && decodeToText(entry.ascii);
+    if (entry.frames) entry.frames = entry.frames.map(decodeToText);
+    delete entry.encoding;
+  };
+
+  if (message.encoding === "compact") {
+    if (message.ascii) message.ascii = decodeToText(message.ascii);
+    if (message.frame) message.frame = decodeToText(message.frame);
+    if (message.frames) message.frames = message.frames.map(decodeToText);
+    delete message.encoding;
+  }
+  expandEntry(message.entry);
+  if (Array.isArray(message.history)) message.history.forEach(expandEntry);
+  return message;
+}
+
+module.exports = { decodeGrid, gridToText, decodeToText, expandCompactMessage };
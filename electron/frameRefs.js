@@ -0,0 +1,47 @@
+// Expands deduplicated / row-delta GIF frames (python/core/frame_delta.py)
+// back into full frame strings before messages reach React.
+
+function applyRowDelta(base, rows) {
+  const lines = base.split("\n");
+  rows.forEach(([row, text]) => {
+    lines[row] = text;
+  });
+  return lines.join("\n");
+}
+
+// Streamed frames per requestId, needed to resolve repeat / delta frames
+const streamedFrames = new Map();
+
+// Replace frame references in a Python message with full frames, in place
+function expandFrameRefs(message) {
+  if (message.type === "gif-frame") {
+    const frames = streamedFrames.get(message.requestId) || [];
+    streamedFrames.set(message.requestId, frames);
+    if (message.repeat !== undefined) {
+      message.frame = frames[message.repeat];
+      delete message.repeat;
+    } else if (message.delta) {
+      message.frame = applyRowDelta(frames[message.delta.base], message.delta.rows);
+      delete message.delta;
+    }
+    frames[message.index] = message.frame;
+    return message;
+  }
+
+  if (message.requestId !== undefined) streamedFrames.delete(message.requestId);
+
+  if (Array.isArray(message.frameIndex)) {
+    const unique = [];
+    message.frames.forEach((frame) => {
+      unique.push(
+        typeof frame === "string" ? frame : applyRowDelta(unique[frame.base], frame.rows)
+      );
+    });
+    message.frames = message.frameIndex.map((position) => unique[position]);
+    delete message.frameIndex;
+    delete message.frameEncoding;
+  }
+  return message;
+}
+
+module.exports = { applyRowDelta, expandFrameRefs };
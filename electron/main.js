@@ -3,6 +3,8 @@ const path = require("path");
 const fs = require("fs");
 const os = require("os");
 const { spawn } = require("child_process");
+const { expandCompactMessage } = require("./compactGrid");
+const { expandFrameRefs } = require("./frameRefs");
 
 let mainWindow;
 let widgetWindows = [];
@@ -91,7 +93,19 @@ function createWindow() {
       lines.forEach((line) => {
         if (line.trim()) {
           try {
-            const jsonResponse = JSON.parse(line);
+            // Compact responses carry packed grids; build the HTML here,
+            // then resolve repeated / row-delta GIF frames
+            const jsonResponse = expandFrameRefs(
+              expandCompactMessage(JSON.parse(line))
+            );
+            // Streamed GIF frames: forward immediately so playback can start early
+            if (jsonResponse.type === "gif-frame") {
+              console.log(
+                `🎞️ Frame ${jsonResponse.index} for request ${jsonResponse.requestId}`
+              );
+              mainWindow.webContents.send("python-response", jsonResponse);
+              return;
+            }
             console.log(
               "✅ Parsed JSON response:",
               jsonResponse.status || jsonResponse.type
@@ -0,0 +1,4 @@
+"""
+AscArt Benchmarks
+Standalone timing scripts for the core conversion pipeline
+"""
@@ -0,0 +1,76 @@
+"""
+Animated Source Benchmark
+Checks that animated WebP/APNG frame durations survive decoding (plain and with
+frameStep), then times full vs targetFps-decimated conversion of a long animation
+
+Run from the python/ directory:
+    python -m benchmarks.bench_animation
+
+Exits with status 1 when a duration check fails.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from core.animation_source import decimate, iter_animation_frames
+from core.gif_processor import GifProcessor
+from .synthetic import make_image
+
+DURATIONS = [40, 50, 60, 70]
+# frameStep 2 folds each dropped frame's duration into the kept one before it
+STEP_2_DURATIONS = [40 + 50, 60 + 70]
+# 0 ms frames play at 100 ms, so targetFps 10 keeps all of them and 5 keeps every other one
+ZERO_DELAYS = [0] * 5
+
+LONG_FRAMES = 300
+LONG_DELAY = 20
+
+
+def _save_animation(path, durations, width=64, height=48):
+    frames = [make_image(width, height, seed=index) for index in range(len(durations))]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=durations, loop=0)
+    return path
+
+
+def check_durations(tmp):
+    """(label, expected, actual) for every format / option combination"""
+    results = []
+    for file_format in ('webp', 'png'):
+        path = _save_animation(os.path.join(tmp, f'durations.{file_format}'), DURATIONS)
+        plain = [delay for _, delay in iter_animation_frames(path)]
+        stepped = [delay for _, delay in iter_animation_frames(path, {'frameStep': 2})]
+        results.append((f'{file_format}', DURATIONS, plain))
+        results.append((f'{file_format} frameStep=2', STEP_2_DURATIONS, stepped))
+    zero_items = list(enumerate(ZERO_DELAYS))
+    results.append(('0 ms targetFps=10', ZERO_DELAYS, [delay for _, delay in decimate(zero_items, 1, 10)]))
+    results.append(('0 ms targetFps=5', [200, 200, 0], [delay for _, delay in decimate(zero_items, 1, 5)]))
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        failed = 0
+        for label, expected, actual in check_durations(tmp):
+            ok = expected == actual
+            failed += not ok
+            print(f"{label:>18} {'ok' if ok else 'FAILED'}  expected {expected} got {actual}")
+
+        path = _save_animation(os.path.join(tmp, 'long.webp'), [LONG_DELAY] * LONG_FRAMES, 320, 180)
+        print()
+        print(f"{LONG_FRAMES} frames at {1000 // LONG_DELAY} fps (320x180 webp)")
+        print(f"{'targetFps':>10} {'frames':>7} {'ms':>9} {'length ms':>10}")
+        for target_fps in (None, 25, 10):
+            options = {'width': 120, 'targetFps': target_fps}
+            start = time.perf_counter()
+            result = GifProcessor().process_and_convert(path, options)
+            elapsed = time.perf_counter() - start
+            print(f"{str(target_fps or '-'):>10} {result['frame_count']:>7} {elapsed * 1000:>9.1f} "
+                  f"{sum(result['delays']):>10}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
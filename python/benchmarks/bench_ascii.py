@@ -0,0 +1,67 @@
+"""
+ASCII Renderer Benchmark
+Compares ImageProcessor.convert_to_ascii against the legacy per-pixel loop
+
+Run from the python/ directory:
+    python -m benchmarks.bench_ascii
+"""
+
+import time
+
+from PIL import Image
+import numpy as np
+
+from core.image_processor import ImageProcessor
+from .legacy import legacy_render_ascii
+from .synthetic import make_image
+
+WIDTHS = (80, 120, 300)
+SCHEMES = ('original', 'sepia', 'cyan')
+REPEATS = 3
+
+
+def _best_of(func, repeats=REPEATS):
+    """Best wall time in seconds over several runs, plus the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _legacy(processor, color_scheme):
+    """Run the legacy loop on the processor's current image"""
+    chars = ImageProcessor.CHARSETS['detailed']
+    gray_pixels = np.array(processor.image.convert('L'))
+    color_pixels = np.array(processor.image)
+    alpha_array = None
+    if processor.alpha_mask is not None:
+        alpha_array = np.array(processor.alpha_mask.resize(processor.image.size, Image.Resampling.LANCZOS))
+    char_indices = ((gray_pixels / 255) * (len(chars) - 1)).astype(int)
+    return legacy_render_ascii(char_indices, color_pixels, chars, True, color_scheme, alpha_array)
+
+
+def main():
+    source = make_image(1920, 1080, mode='RGBA')
+    alpha = source.split()[3]
+
+    print(f"{'width':>6} {'scheme':>9} {'legacy ms':>10} {'new ms':>8} {'speedup':>8}  identical")
+    for width in WIDTHS:
+        for color_scheme in SCHEMES:
+            processor = ImageProcessor()
+            processor.image = source.convert('RGB')
+            processor.alpha_mask = alpha
+            processor.resize_image(width)
+
+            legacy_time, legacy_out = _best_of(lambda: _legacy(processor, color_scheme))
+            new_time, new_out = _best_of(
+                lambda: processor.convert_to_ascii('detailed', colored=True, color_scheme=color_scheme)
+            )
+            print(f"{width:>6} {color_scheme:>9} {legacy_time * 1000:>10.1f} {new_time * 1000:>8.1f} "
+                  f"{legacy_time / new_time:>7.1f}x  {legacy_out == new_out}")
+
+
+if __name__ == '__main__':
+    main()
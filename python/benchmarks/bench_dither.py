@@ -0,0 +1,47 @@
+"""
+Dithering Benchmark
+Compares convert_to_halftone (wavefront Floyd-Steinberg and Bayer) against the legacy loop
+
+Run from the python/ directory:
+    python -m benchmarks.bench_dither
+"""
+
+import time
+
+import numpy as np
+
+from core.image_processor import ImageProcessor
+from .legacy import legacy_halftone
+from .synthetic import make_image
+
+# Requested widths; process_and_convert dithers at 3x this
+WIDTHS = (40, 80, 120)
+
+
+def _timed(func):
+    """Wall time in seconds and result of one call"""
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    source = make_image(1920, 1080, noise=False)
+
+    print(f"{'width':>6} {'dither px':>10} {'legacy ms':>10} {'fs ms':>8} {'bayer ms':>9} {'speedup':>8}  identical")
+    for width in WIDTHS:
+        processor = ImageProcessor()
+        processor.image = source
+        processor.resize_image(width * 3)
+        gray_pixels = np.array(processor.image.convert('L'))
+
+        legacy_time, legacy_out = _timed(lambda: legacy_halftone(gray_pixels))
+        fs_time, fs_out = _timed(lambda: processor.convert_to_halftone('floyd-steinberg'))
+        bayer_time, _ = _timed(lambda: processor.convert_to_halftone('bayer'))
+        size = f"{gray_pixels.shape[1]}x{gray_pixels.shape[0]}"
+        print(f"{width:>6} {size:>10} {legacy_time * 1000:>10.1f} {fs_time * 1000:>8.1f} "
+              f"{bayer_time * 1000:>9.1f} {legacy_time / fs_time:>7.1f}x  {legacy_out == fs_out}")
+
+
+if __name__ == '__main__':
+    main()
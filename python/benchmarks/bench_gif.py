@@ -0,0 +1,97 @@
+"""
+GIF Conversion Benchmark
+Serial vs process-pool frame conversion in GifProcessor, and peak memory
+of the streaming pipeline vs loading every frame up front
+
+Run from the python/ directory:
+    python -m benchmarks.bench_gif
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from core.gif_processor import GifProcessor
+from .synthetic import make_gif
+
+# (frames, width, height)
+GIF_SET = ((10, 480, 270), (60, 480, 270), (200, 480, 270))
+WORKER_COUNTS = (2, 4)
+
+
+def _convert(path, options):
+    """Wall time and frames of one full GIF conversion"""
+    start = time.perf_counter()
+    result = GifProcessor().process_and_convert(path, options)
+    return time.perf_counter() - start, result['frames']
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    # VmHWM resets on exec; ru_maxrss would inherit the parent's peak through fork
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _child_peak_rss(mode, path):
+    """Run one conversion in a fresh interpreter and return its peak RSS in MB"""
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.bench_gif', '--child', mode, path],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return float(output.decode().strip())
+
+
+def _child(mode, path):
+    """Child process body for _child_peak_rss"""
+    processor = GifProcessor()
+    options = {'width': 120}
+    if mode == 'load-all':
+        processor.load_gif(path)
+        processor.convert_frames_to_ascii(options)
+    else:
+        processor.process_and_convert(path, options)
+    print(peak_rss_mb())
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        _child(sys.argv[2], sys.argv[3])
+        return
+
+    print(f"cpu count: {os.cpu_count()}")
+    print(f"{'frames':>6} {'mode':>10} {'ms':>9} {'speedup':>8}  same output")
+    with tempfile.TemporaryDirectory() as tmp:
+        for frame_count, width, height in GIF_SET:
+            path = make_gif(os.path.join(tmp, f'{frame_count}.gif'), frame_count, width, height)
+            options = {'width': 120}
+
+            serial_time, serial_frames = _convert(path, options)
+            print(f"{frame_count:>6} {'serial':>10} {serial_time * 1000:>9.1f} {1.0:>7.1f}x")
+            for workers in WORKER_COUNTS:
+                elapsed, frames = _convert(path, {**options, 'parallel': True, 'workers': workers})
+                print(f"{frame_count:>6} {f'{workers} workers':>10} {elapsed * 1000:>9.1f} "
+                      f"{serial_time / elapsed:>7.1f}x  {frames == serial_frames}")
+
+        print()
+        print(f"{'frames':>6} {'resolution':>10} {'load-all MB':>12} {'streaming MB':>13}")
+        for frame_count in (50, 200):
+            path = make_gif(os.path.join(tmp, f'big{frame_count}.gif'), frame_count, 1280, 720)
+            load_all = _child_peak_rss('load-all', path)
+            streaming = _child_peak_rss('streaming', path)
+            print(f"{frame_count:>6} {'1280x720':>10} {load_all:>12.1f} {streaming:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
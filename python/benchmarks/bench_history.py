@@ -0,0 +1,78 @@
+"""
+History Store Benchmark
+Per-save cost of the SQLite history store vs the old rewrite-everything history.json
+
+Run from the python/ directory:
+    python -m benchmarks.bench_history
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from core.file_handler import FileHandler
+from core.image_processor import ImageProcessor
+from .legacy import legacy_save_history_entry
+from .synthetic import make_image
+
+SAVES = 60
+GIF_FRAMES = 20
+
+
+def _frame(seed):
+    """One colored 120-wide frame, as produced by a real conversion"""
+    processor = ImageProcessor()
+    processor.image = make_image(480, 270, seed=seed, noise=False)
+    processor.resize_image(120)
+    return processor.convert_to_ascii()
+
+
+def _directory_size(path):
+    """Total size in bytes of the files in a directory"""
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    frames = [_frame(seed) for seed in range(GIF_FRAMES)]
+    delays = [80] * GIF_FRAMES
+    options = {'width': 120}
+    print(f"GIF entries: {GIF_FRAMES} frames, {sum(len(f) for f in frames) / 1024:.0f} KB of HTML each")
+
+    with tempfile.TemporaryDirectory() as legacy_dir, tempfile.TemporaryDirectory() as store_dir:
+        legacy_path = os.path.join(legacy_dir, 'history.json')
+        handler = FileHandler(store_dir)
+
+        legacy_times = []
+        store_times = []
+        for _ in range(SAVES):
+            start = time.perf_counter()
+            legacy_save_history_entry(legacy_path, frames[0], options, True, frames, delays)
+            legacy_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            handler.save_history_entry(frames[0], options, is_gif=True, frames=frames, delays=delays)
+            store_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        full_payload = json.dumps({"status": "success", "history": handler.load_history()})
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        page, total = handler.list_history(0, 24)
+        page_payload = json.dumps({"status": "success", "history": page, "total": total})
+        page_time = time.perf_counter() - start
+
+        print(f"{'store':>8} {'first save ms':>14} {'last save ms':>13} {'disk MB':>8}")
+        print(f"{'json':>8} {legacy_times[0] * 1000:>14.1f} {legacy_times[-1] * 1000:>13.1f} "
+              f"{_directory_size(legacy_dir) / 1e6:>8.1f}")
+        print(f"{'sqlite':>8} {store_times[0] * 1000:>14.1f} {store_times[-1] * 1000:>13.1f} "
+              f"{_directory_size(store_dir) / 1e6:>8.1f}")
+        print()
+        print(f"{'get_history':>22} {'ms':>8} {'payload KB':>11}")
+        print(f"{'full (legacy shape)':>22} {full_time * 1000:>8.1f} {len(full_payload) / 1024:>11.1f}")
+        print(f"{'preview page of 24':>22} {page_time * 1000:>8.1f} {len(page_payload) / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
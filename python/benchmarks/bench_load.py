@@ -0,0 +1,76 @@
+"""
+Image Load Benchmark
+Peak RSS and wall time of ImageProcessor.load_image vs the original copy-and-composite
+load path, on large RGBA PNGs and JPEGs, with and without resize-first draft decoding
+
+Run from the python/ directory:
+    python -m benchmarks.bench_load
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from core.image_processor import DRAFT_OVERSAMPLE, ImageProcessor
+from .bench_gif import peak_rss_mb
+from .legacy import legacy_load_image
+from .synthetic import make_image
+
+# (label, width, height, mode, format)
+LOAD_INPUTS = (
+    ('24MP rgba png', 6000, 4000, 'RGBA', 'PNG'),
+    ('24MP jpeg', 6000, 4000, 'RGB', 'JPEG'),
+    ('12MP rgba png', 4240, 2832, 'RGBA', 'PNG'),
+)
+
+# Draft width resize-first mode uses for a 120-column result
+DRAFT_WIDTH = 120 * DRAFT_OVERSAMPLE
+
+
+def _child_measure(loader, path, draft):
+    """Run one load in a fresh interpreter, returns (peak RSS MB, seconds)"""
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.bench_load', '--child', loader, path, draft],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    rss, seconds = output.decode().split()
+    return float(rss), float(seconds)
+
+
+def _child(loader, path, draft):
+    """Child process body for _child_measure"""
+    draft_width = DRAFT_WIDTH if draft == 'draft' else None
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if loader == 'legacy':
+        result = legacy_load_image(path, draft_width)
+    else:
+        processor = ImageProcessor()
+        processor.load_image(path, draft_width)
+        result = processor
+    elapsed = time.perf_counter() - start
+    print(peak_rss_mb() - baseline, elapsed)
+    del result
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == '--child':
+        _child(sys.argv[2], sys.argv[3], sys.argv[4])
+        return
+
+    print(f"{'input':>14} {'decode':>6} {'legacy MB':>10} {'new MB':>8} {'legacy ms':>10} {'new ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, width, height, mode, file_format in LOAD_INPUTS:
+            path = os.path.join(tmp, f"{label.replace(' ', '_')}.{file_format.lower()}")
+            make_image(width, height, mode=mode).save(path, file_format)
+            for draft in ('full', 'draft'):
+                legacy_mb, legacy_s = _child_measure('legacy', path, draft)
+                new_mb, new_s = _child_measure('new', path, draft)
+                print(f"{label:>14} {draft:>6} {legacy_mb:>10.1f} {new_mb:>8.1f} "
+                      f"{legacy_s * 1000:>10.1f} {new_s * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
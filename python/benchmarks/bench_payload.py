@@ -0,0 +1,63 @@
+"""
+Colored Payload Benchmark
+Payload size and end-to-end latency of per-cell vs run-merged colored output
+
+Run from the python/ directory:
+    python -m benchmarks.bench_payload
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+
+from core.image_processor import ImageProcessor
+from .synthetic import make_image
+
+# (label, width, height, noisy)
+IMAGE_SET = (
+    ('photo-noisy', 1920, 1080, True),
+    ('flat-art', 1920, 1080, False),
+    ('square-flat', 1024, 1024, False),
+)
+
+MODES = (
+    ('per-cell', {}),
+    ('merged', {'mergeSpans': True}),
+    ('merged+16lvl', {'mergeSpans': True, 'colorLevels': 16}),
+    ('merged+6lvl', {'mergeSpans': True, 'colorLevels': 6}),
+)
+
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _end_to_end(processor, path, options):
+    """Convert and serialize the response the way main.py does"""
+    start = time.perf_counter()
+    ascii_art = processor.process_and_convert(path, options)
+    payload = json.dumps({"status": "success", "type": "ascii-result", "ascii": ascii_art, "isGif": False})
+    return time.perf_counter() - start, payload, ascii_art
+
+
+def main():
+    processor = ImageProcessor()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'image':>12} {'width':>5} {'mode':>13} {'payload KB':>11} {'ms':>7}  same text")
+        for label, img_w, img_h, noisy in IMAGE_SET:
+            path = os.path.join(tmp, f'{label}.png')
+            make_image(img_w, img_h, noise=noisy).save(path)
+
+            for width in (120, 300):
+                reference = None
+                for mode, extra in MODES:
+                    options = {'width': width, **extra}
+                    elapsed, payload, ascii_art = _end_to_end(processor, path, options)
+                    text = TAG_RE.sub('', ascii_art)
+                    reference = reference if reference is not None else text
+                    print(f"{label:>12} {width:>5} {mode:>13} {len(payload) / 1024:>11.1f} "
+                          f"{elapsed * 1000:>7.1f}  {text == reference}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Point Operations Benchmark
+Fused LUT brightness/contrast/invert vs the three ImageEnhance/ImageOps passes
+
+Run from the python/ directory:
+    python -m benchmarks.bench_point_ops
+"""
+
+import random
+import time
+
+import numpy as np
+from PIL import Image
+
+from core.point_ops import apply_point_ops
+from .legacy import legacy_adjust
+from .synthetic import make_image
+
+SIZES = ((480, 270), (1920, 1080), (4000, 3000))
+SETTINGS = ((20, 100, False), (0, 140, False), (-30, 150, True))
+REPEATS = 3
+# Flat 2-3 color images (logos, pixel art), where the contrast pivot is most sensitive
+FLAT_IMAGES = 300
+
+
+def _best_of(func):
+    """Best wall time in seconds over REPEATS runs, plus the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _flat_image(rng):
+    """Small image made of 2-3 solid colors"""
+    palette = np.array([[rng.randrange(256) for _ in range(3)] for _ in range(rng.choice((2, 3)))], dtype=np.uint8)
+    width, height = rng.randint(8, 200), rng.randint(8, 200)
+    cells = np.array([rng.randrange(len(palette)) for _ in range(width * height)]).reshape(height, width)
+    return Image.fromarray(palette[cells])
+
+
+def count_flat_mismatches(count=FLAT_IMAGES, seed=0):
+    """Flat images (with contrast != 100) whose fused output differs from the three passes"""
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(count):
+        image = _flat_image(rng)
+        brightness, contrast, invert = rng.choice((0, 20, -30)), rng.choice((50, 140, 180)), rng.random() < 0.5
+        legacy_out = legacy_adjust(image, brightness, contrast, invert)
+        fused_out = apply_point_ops(image, brightness, contrast, invert)
+        mismatches += not np.array_equal(np.array(legacy_out), np.array(fused_out))
+    return mismatches
+
+
+def main():
+    print(f"{'size':>10} {'b/c/inv':>14} {'legacy ms':>10} {'fused ms':>9} {'speedup':>8}  identical")
+    for width, height in SIZES:
+        image = make_image(width, height)
+        for brightness, contrast, invert in SETTINGS:
+            legacy_time, legacy_out = _best_of(lambda: legacy_adjust(image, brightness, contrast, invert))
+            fused_time, fused_out = _best_of(lambda: apply_point_ops(image, brightness, contrast, invert))
+            identical = np.array_equal(np.array(legacy_out), np.array(fused_out))
+            label = f"{brightness}/{contrast}/{int(invert)}"
+            print(f"{f'{width}x{height}':>10} {label:>14} {legacy_time * 1000:>10.1f} {fused_time * 1000:>9.1f} "
+                  f"{legacy_time / fused_time:>7.1f}x  {identical}")
+    print()
+    print(f"flat 2-3 color images differing from the three passes: {count_flat_mismatches()} / {FLAT_IMAGES}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Resize-First Benchmark
+Default (adjust then resize) vs resizeFirst (draft/reduce, resize, then adjust) on large inputs
+
+Run from the python/ directory:
+    python -m benchmarks.bench_resize_first
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from core.image_processor import ImageProcessor
+from .synthetic import make_image
+
+# (label, width, height, format)
+LARGE_INPUTS = (
+    ('24MP jpeg', 6000, 4000, 'JPEG'),
+    ('12MP jpeg', 4240, 2832, 'JPEG'),
+    ('12MP png', 4240, 2832, 'PNG'),
+)
+
+ADJUSTMENTS = {'brightness': 20, 'contrast': 130, 'invert': False}
+REPEATS = 3
+
+
+def _run(path, options):
+    """Best wall time over REPEATS and the final processor state"""
+    best = float('inf')
+    processor = None
+    for _ in range(REPEATS):
+        processor = ImageProcessor()
+        start = time.perf_counter()
+        processor.process_and_convert(path, options)
+        best = min(best, time.perf_counter() - start)
+    return best, processor
+
+
+def _char_grid(processor):
+    """Character indices the renderer would pick for the final image"""
+    gray = np.array(processor.image.convert('L'))
+    return ((gray / 255) * (len(ImageProcessor.CHARSETS['detailed']) - 1)).astype(int)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'input':>10} {'width':>5} {'default ms':>11} {'resize-first ms':>16} {'speedup':>8} "
+              f"{'same chars':>11} {'mean |dRGB|':>12}")
+        for label, img_w, img_h, fmt in LARGE_INPUTS:
+            path = os.path.join(tmp, f'{label.replace(" ", "_")}.{fmt.lower()}')
+            make_image(img_w, img_h, noise=False).save(path, fmt)
+
+            for width in (120, 300):
+                options = {'width': width, **ADJUSTMENTS}
+                default_time, default_proc = _run(path, options)
+                fast_time, fast_proc = _run(path, {**options, 'resizeFirst': True})
+
+                same_chars = np.mean(_char_grid(default_proc) == _char_grid(fast_proc))
+                color_diff = np.abs(
+                    np.array(default_proc.image, dtype=np.int16) - np.array(fast_proc.image, dtype=np.int16)
+                ).mean()
+                print(f"{label:>10} {width:>5} {default_time * 1000:>11.1f} {fast_time * 1000:>16.1f} "
+                      f"{default_time / fast_time:>7.1f}x {same_chars:>10.1%} {color_diff:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
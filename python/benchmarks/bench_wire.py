@@ -0,0 +1,119 @@
+"""
+Wire Format Benchmark
+Round trip of results over a pipe: JSON with HTML vs compact packed grids
+
+Run from the python/ directory:
+    python -m benchmarks.bench_wire
+
+The consumer mirrors electron/main.js: it accumulates chunks, splits on
+newlines and parses each line; for compact messages it then builds the
+HTML from the grid (wire_format.grid_to_text stands in for compactGrid.js).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from core.gif_processor import GifProcessor
+from core.image_processor import ImageProcessor
+from core.wire_format import grid_to_text, unpack_grid
+from .synthetic import make_gif, make_image
+
+# (label, kind, width, height, noisy)
+INPUT_SET = (
+    ('photo-noisy', 'image', 1920, 1080, True),
+    ('flat-art', 'image', 1920, 1080, False),
+    ('gif-60', 'gif', 480, 360, True),
+)
+
+WIDTHS = (120, 300)
+CHUNK_SIZE = 64 * 1024
+
+
+def _messages(path, kind, options):
+    """Produce the response messages main.py would print for one convert"""
+    if kind == 'gif':
+        frames = GifProcessor().process_and_convert(path, options)['frames']
+        return [{"status": "success", "type": "gif-frame", "index": i, "frame": frame,
+                 "encoding": 'compact' if options.get('compact') else None}
+                for i, frame in enumerate(frames)]
+    ascii_art = ImageProcessor().process_and_convert(path, options)
+    message = {"status": "success", "type": "ascii-result", "ascii": ascii_art}
+    if options.get('compact'):
+        message["encoding"] = 'compact'
+    return [message]
+
+
+def _consume(read_fd, results):
+    """Electron-style reader: buffer, split lines, parse, expand compact grids"""
+    buffer = ''
+    with os.fdopen(read_fd, 'rb') as reader:
+        while True:
+            chunk = reader.read1(CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk.decode('utf-8')
+            lines = buffer.split('\n')
+            buffer = lines.pop()
+            for line in lines:
+                message = json.loads(line)
+                if message.get('encoding') == 'compact':
+                    key = 'frame' if 'frame' in message else 'ascii'
+                    message[key] = grid_to_text(unpack_grid(message[key]))
+                results.append(message)
+
+
+def _round_trip(messages):
+    """Serialize, send over a pipe and decode; returns (seconds, bytes, decoded messages)"""
+    read_fd, write_fd = os.pipe()
+    results = []
+    reader = threading.Thread(target=_consume, args=(read_fd, results))
+    reader.start()
+
+    sent = 0
+    start = time.perf_counter()
+    with os.fdopen(write_fd, 'wb') as writer:
+        for message in messages:
+            line = (json.dumps(message) + '\n').encode('utf-8')
+            sent += len(line)
+            writer.write(line)
+    reader.join()
+    return time.perf_counter() - start, sent, results
+
+
+def _text_of(messages):
+    """Rendered text of each message, for comparing the two transports"""
+    return [message.get('frame', message.get('ascii')) for message in messages]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'input':>12} {'width':>5} {'mode':>8} {'wire KB':>9} {'render ms':>10} "
+              f"{'transport ms':>13} {'total ms':>9}  same output")
+        for label, kind, img_w, img_h, noisy in INPUT_SET:
+            if kind == 'gif':
+                path = os.path.join(tmp, f'{label}.gif')
+                make_gif(path, 60, img_w, img_h, noise=noisy)
+            else:
+                path = os.path.join(tmp, f'{label}.png')
+                make_image(img_w, img_h, noise=noisy).save(path)
+
+            for width in WIDTHS:
+                reference = None
+                for mode, extra in (('json', {}), ('compact', {'compact': True})):
+                    options = {'width': width, 'mergeSpans': True, **extra}
+                    start = time.perf_counter()
+                    messages = _messages(path, kind, options)
+                    render = time.perf_counter() - start
+                    transport, sent, received = _round_trip(messages)
+
+                    text = _text_of(received)
+                    reference = reference if reference is not None else text
+                    print(f"{label:>12} {width:>5} {mode:>8} {sent / 1024:>9.1f} {render * 1000:>10.1f} "
+                          f"{transport * 1000:>13.1f} {(render + transport) * 1000:>9.1f}  {text == reference}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Legacy Reference Implementations
+Original per-pixel loops, kept to verify output equality and as a timing baseline
+"""
+
+import numpy as np
+
+
+def legacy_render_ascii(char_indices, color_pixels, chars, colored=True,
+                        color_scheme='original', alpha_array=None):
+    """Original nested-loop body of ImageProcessor.convert_to_ascii"""
+    if colored:
+        html_lines = []
+        for row_idx, row in enumerate(char_indices):
+            line_spans = []
+            for col_idx, char_idx in enumerate(row):
+                if alpha_array is not None and alpha_array[row_idx, col_idx] < 10:
+                    line_spans.append(' ')
+                else:
+                    char = chars[char_idx]
+                    r, g, b = color_pixels[row_idx, col_idx]
+
+                    if color_scheme == 'grayscale':
+                        gray = int(0.299 * r + 0.587 * g + 0.114 * b)
+                        r, g, b = gray, gray, gray
+                    elif color_scheme == 'sepia':
+                        tr = int(0.393 * r + 0.769 * g + 0.189 * b)
+                        tg = int(0.349 * r + 0.686 * g + 0.168 * b)
+                        tb = int(0.272 * r + 0.534 * g + 0.131 * b)
+                        r, g, b = min(255, tr), min(255, tg), min(255, tb)
+                    elif color_scheme == 'blue':
+                        gray = int(0.299 * r + 0.587 * g + 0.114 * b)
+                        r, g, b = gray // 3, gray // 2, gray
+                    elif color_scheme == 'green':
+                        gray = int(0.299 * r + 0.587 * g + 0.114 * b)
+                        r, g, b = gray // 3, gray, gray // 2
+                    elif color_scheme == 'red':
+                        gray = int(0.299 * r + 0.587 * g + 0.114 * b)
+                        r, g, b = gray, gray // 3, gray // 3
+                    elif color_scheme == 'purple':
+                        gray = int(0.299 * r + 0.587 * g + 0.114 * b)
+                        r, g, b = gray, gray // 3, gray
+                    elif color_scheme == 'cyan':
+                        gray = int(0.299 * r + 0.587 * g + 0.114 * b)
+                        r, g, b = gray // 3, gray, gray
+
+                    line_spans.append(f'<span style="color:rgb({r},{g},{b})">{char}</span>')
+            html_lines.append(''.join(line_spans))
+
+        return '\n'.join(html_lines)
+
+    ascii_art = []
+    for row_idx, row in enumerate(char_indices):
+        ascii_row = ''
+        for col_idx, char_idx in enumerate(row):
+            if alpha_array is not None and alpha_array[row_idx, col_idx] < 10:
+                ascii_row += ' '
+            else:
+                ascii_row += chars[char_idx]
+        ascii_art.append(ascii_row)
+
+    return '\n'.join(ascii_art)
+
+
+def legacy_halftone(gray_pixels, alpha_array=None):
+    """Original scan-line Floyd-Steinberg body of ImageProcessor.convert_to_halftone"""
+    height, width = gray_pixels.shape
+    dithered = gray_pixels.astype(np.float32).copy()
+
+    for y in range(height):
+        for x in range(width):
+            old_pixel = dithered[y, x]
+            new_pixel = 255 if old_pixel > 128 else 0
+            dithered[y, x] = new_pixel
+            error = old_pixel - new_pixel
+
+            if x + 1 < width:
+                dithered[y, x + 1] += error * 7 / 16
+            if y + 1 < height:
+                if x > 0:
+                    dithered[y + 1, x - 1] += error * 3 / 16
+                dithered[y + 1, x] += error * 5 / 16
+                if x + 1 < width:
+                    dithered[y + 1, x + 1] += error * 1 / 16
+
+    halftone_lines = []
+    for row_idx, row in enumerate(dithered):
+        line = ''
+        for col_idx, pixel_value in enumerate(row):
+            if alpha_array is not None and alpha_array[row_idx, col_idx] < 10:
+                line += ' '
+            elif pixel_value < 128:
+                line += '█'
+            else:
+                line += ' '
+        halftone_lines.append(line)
+
+    return '\n'.join(halftone_lines)
+
+
+def legacy_adjust(image, brightness=0, contrast=100, invert=False):
+    """Original three-pass brightness / contrast / invert"""
+    from PIL import ImageEnhance, ImageOps
+
+    if brightness != 0:
+        image = ImageEnhance.Brightness(image).enhance(1.0 + brightness / 100.0)
+    if contrast != 100:
+        image = ImageEnhance.Contrast(image).enhance(contrast / 100.0)
+    if invert:
+        image = ImageOps.invert(image)
+    return image
+
+
+def legacy_save_history_entry(history_path, ascii_art, options, is_gif=False, frames=None, delays=None):
+    """Original read-append-rewrite history.json save"""
+    import json
+    import os
+    from datetime import datetime
+
+    history = []
+    if os.path.exists(history_path):
+        with open(history_path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+
+    entry = {
+        'timestamp': datetime.now().isoformat(),
+        'ascii': ascii_art,
+        'preview': ascii_art[:500],
+        'options': options,
+        'isGif': is_gif
+    }
+    if is_gif and frames and delays:
+        entry['frames'] = frames
+        entry['delays'] = delays
+
+    history.append(entry)
+    history = history[-50:]
+
+    with open(history_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+
+
+def legacy_load_image(path, draft_width=None):
+    """Original ImageProcessor.load_image: keeps the source open, copies it and composites at full size"""
+    from PIL import Image
+
+    original = Image.open(path)
+    if draft_width and original.format == 'JPEG':
+        orig_width, orig_height = original.size
+        if orig_width > draft_width:
+            original.draft('RGB', (draft_width, max(1, orig_height * draft_width // orig_width)))
+    image = original.copy()
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'RGBA':
+            background.paste(image, mask=image.split()[3])
+        elif image.mode == 'LA':
+            background.paste(image.convert('RGB'), mask=image.split()[1])
+        else:
+            image = image.convert('RGBA')
+            background.paste(image, mask=image.split()[3])
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    return original, image
@@ -0,0 +1,251 @@
+"""
+Pipeline Benchmark Suite
+Times every stage of the image and GIF pipelines on synthetic inputs, writes the
+results as JSON and compares them against a stored baseline
+
+Run from the python/ directory:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json
+    python -m benchmarks.suite --quick --compare baseline.json --threshold 0.25
+
+Exits with status 1 when --compare finds a regression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import PIL
+
+from core.file_handler import FileHandler
+from core.gif_processor import GifProcessor
+from core.image_processor import ImageProcessor
+from .synthetic import make_gif, make_image
+
+# (label, width, height): thumbnail to 24 MP
+IMAGE_SIZES = (
+    ('thumb', 160, 120),
+    ('vga', 640, 480),
+    ('2mp', 1920, 1080),
+    ('12mp', 4240, 2832),
+    ('24mp', 6000, 4000),
+)
+
+# (frames, width, height)
+GIF_SIZES = ((10, 320, 180), (100, 320, 180), (500, 320, 180))
+
+# --quick drops the slowest inputs
+QUICK_IMAGE_SIZES = ('thumb', 'vga', '2mp')
+QUICK_GIF_FRAMES = (10, 100)
+
+ADJUSTMENTS = {'brightness': 20, 'contrast': 130, 'invert': False}
+WIDTH = 120
+HISTORY_SAVES = 20
+
+# Relative slowdown (0.15 = 15%) above which --compare reports a regression
+DEFAULT_THRESHOLD = 0.15
+# Stages faster than this are too noisy to flag
+MIN_COMPARE_MS = 1.0
+
+
+def _time(func, repeats):
+    """Wall times in milliseconds of repeats calls to func"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def _summary(times):
+    return {
+        'medianMs': statistics.median(times),
+        'minMs': min(times),
+        'maxMs': max(times),
+        'runs': len(times),
+    }
+
+
+def _loaded(path):
+    processor = ImageProcessor()
+    processor.load_image(path)
+    return processor
+
+
+def bench_image(path, repeats):
+    """Per-stage timings for one still image: load, adjust, resize, ASCII and halftone rendering"""
+    results = {}
+    results['load'] = _time(lambda: _loaded(path), repeats)
+
+    processor = _loaded(path)
+    decoded = processor.image
+
+    def adjust():
+        processor.image = decoded
+        processor.apply_adjustments(ADJUSTMENTS)
+    results['adjust'] = _time(adjust, repeats)
+
+    def resize():
+        processor.image = decoded
+        processor.resize_image(WIDTH)
+    results['resize'] = _time(resize, repeats)
+
+    processor.image = decoded
+    processor.resize_image(WIDTH)
+    resized = processor.image
+
+    def ascii_colored():
+        processor.image = resized
+        processor.convert_to_ascii()
+    results['convert_to_ascii'] = _time(ascii_colored, repeats)
+
+    # Halftone renders at 3x the width, like process_and_convert does
+    processor.image = decoded
+    processor.resize_image(WIDTH * 3)
+    halftone_input = processor.image
+
+    def halftone():
+        processor.image = halftone_input
+        processor.convert_to_halftone()
+    results['convert_to_halftone'] = _time(halftone, repeats)
+
+    results['process_and_convert'] = _time(
+        lambda: ImageProcessor().process_and_convert(path, {'width': WIDTH, **ADJUSTMENTS}), repeats
+    )
+    return {stage: _summary(times) for stage, times in results.items()}
+
+
+def bench_gif(path, repeats):
+    """Full GIF conversion, serial"""
+    times = _time(lambda: GifProcessor().process_and_convert(path, {'width': WIDTH}), repeats)
+    return {'convert': _summary(times)}
+
+
+def bench_history(output_dir, repeats):
+    """History store writes for a still image and a 20-frame GIF entry"""
+    processor = ImageProcessor()
+    processor.image = make_image(480, 270, noise=False)
+    processor.resize_image(WIDTH)
+    frame = processor.convert_to_ascii()
+    frames = [frame] * 20
+    handler = FileHandler(output_dir)
+
+    def save_image():
+        for _ in range(HISTORY_SAVES):
+            handler.save_history_entry(frame, {'width': WIDTH})
+
+    def save_gif():
+        for _ in range(HISTORY_SAVES):
+            handler.save_history_entry(frame, {'width': WIDTH}, is_gif=True, frames=frames, delays=[80] * 20)
+
+    # Per-entry cost: each timed run writes HISTORY_SAVES entries
+    return {
+        'save_image': _summary([t / HISTORY_SAVES for t in _time(save_image, repeats)]),
+        'save_gif': _summary([t / HISTORY_SAVES for t in _time(save_gif, repeats)]),
+    }
+
+
+def run_suite(quick=False, repeats=3):
+    """Run every benchmark, returns {'meta': ..., 'results': {name: summary}}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, width, height in IMAGE_SIZES:
+            if quick and label not in QUICK_IMAGE_SIZES:
+                continue
+            path = os.path.join(tmp, f'{label}.png')
+            make_image(width, height).save(path)
+            print(f"image {label} ({width}x{height})", file=sys.stderr)
+            for stage, summary in bench_image(path, repeats).items():
+                results[f'image/{label}/{stage}'] = summary
+
+        for frame_count, width, height in GIF_SIZES:
+            if quick and frame_count not in QUICK_GIF_FRAMES:
+                continue
+            path = make_gif(os.path.join(tmp, f'{frame_count}.gif'), frame_count, width, height)
+            print(f"gif {frame_count} frames ({width}x{height})", file=sys.stderr)
+            # Long GIFs take seconds per run; one run is enough to spot a regression
+            gif_repeats = repeats if frame_count <= 100 else 1
+            for stage, summary in bench_gif(path, gif_repeats).items():
+                results[f'gif/{frame_count}f/{stage}'] = summary
+
+        print("history", file=sys.stderr)
+        for stage, summary in bench_history(os.path.join(tmp, 'history'), repeats).items():
+            results[f'history/{stage}'] = summary
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'pillow': PIL.__version__,
+            'platform': platform.platform(),
+            'cpuCount': os.cpu_count(),
+            'quick': quick,
+            'repeats': repeats,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Median-to-median comparison, returns a list of rows for benchmarks present in both runs"""
+    rows = []
+    for name, summary in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = summary['medianMs'] / base['medianMs'] if base['medianMs'] > 0 else 1.0
+        regressed = ratio > 1 + threshold and summary['medianMs'] >= MIN_COMPARE_MS
+        rows.append({
+            'name': name,
+            'baselineMs': base['medianMs'],
+            'currentMs': summary['medianMs'],
+            'ratio': ratio,
+            'regression': regressed,
+        })
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description='Core pipeline benchmarks')
+    parser.add_argument('--quick', action='store_true', help='skip 12/24 MP images and the 500-frame GIF')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per stage (default: 3)')
+    parser.add_argument('--output', default=None, help='write results JSON to this file (default: stdout)')
+    parser.add_argument('--compare', default=None, help='baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'relative slowdown counted as a regression (default: {DEFAULT_THRESHOLD})')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    current = run_suite(args.quick, max(1, args.repeats))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+    elif not args.compare:
+        print(json.dumps(current, indent=2))
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    print(f"{'benchmark':<34} {'baseline ms':>12} {'current ms':>11} {'ratio':>6}")
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['name']:<34} {row['baselineMs']:>12.2f} {row['currentMs']:>11.2f} {row['ratio']:>6.2f}{flag}")
+    regressions = [row for row in rows if row['regression']]
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%} in {len(rows)} compared benchmarks")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Synthetic Inputs
+Deterministic test images generated locally for benchmarks
+"""
+
+from PIL import Image
+import numpy as np
+
+
+def make_image(width, height, seed=0, mode='RGB', noise=True):
+    """Gradient image with a noisy (or smooth) blue channel, deterministic per seed"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    r = (x * 255 // max(width - 1, 1)).astype(np.uint8)
+    g = (y * 255 // max(height - 1, 1)).astype(np.uint8)
+    if noise:
+        b = rng.integers(0, 256, size=(height, width), dtype=np.uint8)
+    else:
+        # Flat color blocks, closer to logos / flat artwork
+        b = ((x // max(width // 8, 1) + y // max(height // 6, 1)) * 37 % 256).astype(np.uint8)
+    pixels = np.stack([r, g, b], axis=-1)
+
+    image = Image.fromarray(pixels, 'RGB')
+    if mode == 'RGBA':
+        # Circular alpha so transparency paths get exercised
+        cy, cx = height / 2, width / 2
+        radius = min(width, height) / 2
+        inside = ((x - cx) ** 2 + (y - cy) ** 2) < radius ** 2
+        alpha = np.where(inside, 255, 0).astype(np.uint8)
+        image = Image.fromarray(np.dstack([pixels, alpha]), 'RGBA')
+    return image
+
+
+def make_gif(path, frame_count, width, height, seed=0, noise=True, delay=80):
+    """Write an animated GIF whose gradient shifts every frame"""
+    base = np.array(make_image(width, height, seed=seed, noise=noise))
+    frames = []
+    for index in range(frame_count):
+        shifted = np.roll(base, shift=index * max(width // frame_count, 1), axis=1)
+        frames.append(Image.fromarray(shifted, 'RGB'))
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=delay, loop=0)
+    return path
@@ -5,5 +5,7 @@ AscArt Core Processing Module
 from .image_processor import ImageProcessor
 from .gif_processor import GifProcessor
 from .file_handler import FileHandler
+from .result_cache import ResultCache
+from .stage_cache import StageCache
 
-__all__ = ['ImageProcessor', 'GifProcessor', 'FileHandler']
+__all__ = ['ImageProcessor', 'GifProcessor', 'FileHandler', 'ResultCache', 'StageCache']
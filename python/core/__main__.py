@@ -0,0 +1,73 @@
+"""
+AscArt Batch CLI
+Convert a directory or glob of images to ASCII files without the Electron app
+
+Run from the python/ directory:
+    python -m core photos/ --format html --width 160
+    python -m core "assets/**/*.png" --output output/batch --workers 8
+"""
+
+import argparse
+import json
+import sys
+
+from .batch import BATCH_FORMATS, collect_inputs, run_batch
+from .file_handler import FileHandler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m core', description='Batch convert images to ASCII art')
+    parser.add_argument('source', help='directory, glob pattern or single image')
+    parser.add_argument('--output', default='output/batch', help='output directory (default: output/batch)')
+    parser.add_argument('--format', choices=BATCH_FORMATS, default='txt', help='output format (default: txt)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--recursive', action='store_true', help='include subdirectories of a directory source')
+    parser.add_argument('--width', type=int, default=120)
+    parser.add_argument('--charset', default='detailed')
+    parser.add_argument('--color-scheme', default='original')
+    parser.add_argument('--dither', action='store_true', help='black & white halftone output')
+    parser.add_argument('--remove-background', action='store_true')
+    parser.add_argument('--options', default=None, help='extra convert options as JSON, e.g. \'{"contrast": 120}\'')
+    parser.add_argument('--json', action='store_true', help='print the summary as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    options = {
+        'width': args.width,
+        'charset': args.charset,
+        'colorScheme': args.color_scheme,
+        'dither': args.dither,
+        'removeBackground': args.remove_background,
+        'resizeFirst': True,
+        'mergeSpans': True,
+    }
+    if args.options:
+        options.update(json.loads(args.options))
+
+    paths = collect_inputs(args.source, args.recursive)
+    if not paths:
+        print(f"No images found for {args.source}", file=sys.stderr)
+        return 1
+
+    def progress(done, total, path, error):
+        status = f"FAILED: {error}" if error else "ok"
+        print(f"[{done}/{total}] {path} {status}", file=sys.stderr)
+
+    summary = run_batch(paths, options, FileHandler(args.output), args.format, args.workers, on_result=progress)
+
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(f"Converted {summary['converted']}/{summary['files']} files "
+              f"({summary['failed']} failed) with {summary['workers']} workers in {summary['seconds']:.2f}s")
+        print(f"Throughput: {summary['filesPerSecond']:.1f} files/s, "
+              f"latency p50 {summary['p50Ms']:.0f} ms, p95 {summary['p95Ms']:.0f} ms")
+        print(f"Output: {args.output}")
+    return 0 if summary['failed'] == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Animation Source Module
+Streams (frame, delay) pairs from animated GIF/WebP/PNG files and numbered image-sequence
+directories, with optional frame-step and target-FPS decimation
+"""
+
+import math
+import os
+import re
+
+from PIL import Image, ImageSequence
+
+# Extensions whose files are routed to the animated pipeline without opening them
+ANIMATED_EXTENSIONS = ('.gif',)
+# Extensions that may or may not be animated (checked with Pillow's is_animated)
+MAYBE_ANIMATED_EXTENSIONS = ('.webp', '.png', '.apng')
+# Files picked up as frames of an image-sequence directory
+SEQUENCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp', '.tif', '.tiff')
+
+DEFAULT_DELAY_MS = 100
+# Browsers clamp GIF delays below 20 ms to 100 ms; playback and decimation do the same
+MIN_DELAY_MS = 20
+# Frame rate assumed for image sequences when options carry no sequenceFps
+DEFAULT_SEQUENCE_FPS = 10
+
+_NUMBER = re.compile(r'(\d+)')
+
+
+def _natural_key(name):
+    """Sort key treating digit runs as numbers: frame2 < frame10"""
+    return [int(part) if part.isdigit() else part.lower() for part in _NUMBER.split(name)]
+
+
+def sequence_paths(directory):
+    """Image files of a sequence directory in natural (frame number) order"""
+    names = [
+        name for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in SEQUENCE_EXTENSIONS
+        and os.path.isfile(os.path.join(directory, name))
+    ]
+    return [os.path.join(directory, name) for name in sorted(names, key=_natural_key)]
+
+
+def is_animated(path):
+    """Whether path should go through the animated pipeline (GIF, animated WebP/APNG, sequence dir)"""
+    if os.path.isdir(path):
+        return bool(sequence_paths(path))
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ANIMATED_EXTENSIONS:
+        return True
+    if ext in MAYBE_ANIMATED_EXTENSIONS:
+        try:
+            with Image.open(path) as image:
+                return getattr(image, 'is_animated', False)
+        except OSError:
+            return False
+    return False
+
+
+def _to_rgb(frame, composite_alpha):
+    """Detached RGB copy of a frame, transparency composited onto white when asked"""
+    if composite_alpha and frame.mode in ('RGBA', 'LA', 'P'):
+        rgba = frame.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return frame.convert('RGB')
+
+
+def _frame_delay(frame):
+    """Frame duration in ms from Pillow's frame info
+
+    The frame is loaded first: the WebP plugin only sets the duration in load(),
+    so before that info still holds the previous frame's value.
+    """
+    frame.load()
+    return int(round(frame.info.get('duration', DEFAULT_DELAY_MS)))
+
+
+def effective_delay(delay_ms):
+    """Delay in ms a frame is actually shown for, with the browser clamp applied"""
+    if not delay_ms or delay_ms < MIN_DELAY_MS:
+        return DEFAULT_DELAY_MS
+    return delay_ms
+
+
+def decimate(items, frame_step=1, target_fps=None, load=None):
+    """Keep every frame_step-th item and at most target_fps per second of animation time
+
+    items are (item, delay_ms) pairs; load(item) is only called for kept items.
+    Dropped durations are added to the previous kept frame so total playback time is
+    unchanged. Timing uses effective_delay, so 0 ms frames count as 100 ms like in
+    the player. Holds at most one kept frame while looking ahead for its duration.
+    """
+    frame_step = max(1, int(frame_step or 1))
+    interval = 1000 / target_fps if target_fps else 0
+    pending = None
+    pending_delay = 0
+    elapsed = 0
+    next_slot = 0
+    for index, (item, delay) in enumerate(items):
+        if index % frame_step == 0 and elapsed >= next_slot:
+            if pending is not None:
+                yield pending, pending_delay
+            pending = load(item) if load else item
+            pending_delay = delay
+            if interval:
+                next_slot = (math.floor(elapsed / interval) + 1) * interval
+        else:
+            pending_delay = effective_delay(pending_delay) + effective_delay(delay)
+        elapsed += effective_delay(delay)
+    if pending is not None:
+        yield pending, pending_delay
+
+
+def iter_animation_frames(path, options=None):
+    """Decode frames one at a time, yielding (RGB frame, delay in ms)
+
+    Options: frameStep (keep every Nth frame), targetFps (drop frames above this
+    rate), sequenceFps (frame rate of an image-sequence directory).
+    """
+    options = options or {}
+    frame_step = options.get('frameStep', 1)
+    target_fps = options.get('targetFps')
+
+    if os.path.isdir(path):
+        delay = int(round(1000 / (options.get('sequenceFps') or DEFAULT_SEQUENCE_FPS)))
+
+        def load(frame_path):
+            with Image.open(frame_path) as image:
+                return _to_rgb(image, True)
+
+        # Decimate on paths so skipped files are never decoded
+        items = ((frame_path, delay) for frame_path in sequence_paths(path))
+        yield from decimate(items, frame_step, target_fps, load)
+        return
+
+    with Image.open(path) as animation:
+        # GIF keeps its established RGB conversion; WebP/APNG frames carry real alpha
+        composite_alpha = animation.format != 'GIF'
+        items = ((frame, _frame_delay(frame)) for frame in ImageSequence.Iterator(animation))
+        yield from decimate(items, frame_step, target_fps, lambda frame: _to_rgb(frame, composite_alpha))
@@ -0,0 +1,215 @@
+"""
+ASCII Rendering Module
+Vectorized color schemes and string emitters for ASCII output
+"""
+
+import numpy as np
+
+# Luminance weights (ITU-R 601), same constants used by the color schemes
+LUMA_WEIGHTS = (0.299, 0.587, 0.114)
+
+# Sepia tone matrix: one row of (r, g, b) weights per output channel
+SEPIA_MATRIX = (
+    (0.393, 0.769, 0.189),
+    (0.349, 0.686, 0.168),
+    (0.272, 0.534, 0.131),
+)
+
+# Tinted schemes: luminance integer-divided per channel by (r, g, b)
+TINT_DIVISORS = {
+    'blue': (3, 2, 1),
+    'green': (3, 1, 2),
+    'red': (1, 3, 3),
+    'purple': (1, 3, 1),
+    'cyan': (3, 1, 1),
+}
+
+# Alpha values below this are treated as fully transparent
+ALPHA_THRESHOLD = 10
+
+
+def _weighted_sum(r, g, b, weights):
+    """Weighted channel sum truncated to int (matches int() on each pixel)"""
+    wr, wg, wb = weights
+    # Summed in the same order as the scalar expression so results are bit-identical
+    return (wr * r + wg * g + wb * b).astype(np.int64)
+
+
+def apply_color_scheme(color_pixels, color_scheme='original'):
+    """Apply a color scheme to an (H, W, 3) RGB array, returns int64 array"""
+    rgb = color_pixels[..., :3].astype(np.int64)
+
+    if color_scheme == 'sepia':
+        rgb_f = rgb.astype(np.float64)
+        r, g, b = rgb_f[..., 0], rgb_f[..., 1], rgb_f[..., 2]
+        channels = [np.minimum(255, _weighted_sum(r, g, b, row)) for row in SEPIA_MATRIX]
+        return np.stack(channels, axis=-1)
+
+    if color_scheme == 'grayscale' or color_scheme in TINT_DIVISORS:
+        rgb_f = rgb.astype(np.float64)
+        gray = _weighted_sum(rgb_f[..., 0], rgb_f[..., 1], rgb_f[..., 2], LUMA_WEIGHTS)
+        divisors = TINT_DIVISORS.get(color_scheme, (1, 1, 1))
+        return np.stack([gray // d for d in divisors], axis=-1)
+
+    # 'original' and unknown schemes keep source colors
+    return rgb
+
+
+def brightness_to_char_indices(gray_pixels, char_count):
+    """Map 0-255 brightness to indices into a charset of char_count + 1 chars"""
+    return ((gray_pixels / 255) * char_count).astype(int)
+
+
+def transparent_mask(alpha_array):
+    """Boolean mask of transparent cells, or None when there is no alpha"""
+    if alpha_array is None:
+        return None
+    return alpha_array < ALPHA_THRESHOLD
+
+
+def _join_rows(table, cell_ids):
+    """Look up every cell in a string table and join into lines"""
+    cells = table[cell_ids]
+    return '\n'.join(''.join(row) for row in cells.tolist())
+
+
+def render_plain(char_indices, chars, transparent=None):
+    """Render monochrome ASCII from a char index array"""
+    table = np.empty(len(chars) + 1, dtype=object)
+    table[:len(chars)] = list(chars)
+    table[len(chars)] = ' '
+
+    cell_ids = char_indices
+    if transparent is not None:
+        cell_ids = np.where(transparent, len(chars), char_indices)
+
+    return _join_rows(table, cell_ids)
+
+
+def _html_piece_tables(chars):
+    """Precomputed string tables for each piece of a colored span"""
+    red = np.array([f'<span style="color:rgb({v}' for v in range(256)], dtype=object)
+    green = np.array([f',{v}' for v in range(256)], dtype=object)
+    blue = np.array([f',{v})">' for v in range(256)], dtype=object)
+    glyphs = np.array([f'{c}</span>' for c in chars], dtype=object)
+    return red, green, blue, glyphs
+
+
+def render_html(char_indices, colors, chars, transparent=None):
+    """Render colored HTML with one <span> per visible cell"""
+    height, width = char_indices.shape
+    red, green, blue, glyphs = _html_piece_tables(chars)
+
+    # Each cell is four table lookups: rgb( r , g , b )"> char </span>
+    pieces = np.empty((height, width, 4), dtype=object)
+    pieces[..., 0] = red[colors[..., 0]]
+    pieces[..., 1] = green[colors[..., 1]]
+    pieces[..., 2] = blue[colors[..., 2]]
+    pieces[..., 3] = glyphs[char_indices]
+
+    if transparent is not None:
+        pieces[transparent] = (' ', '', '', '')
+
+    return '\n'.join(''.join(row) for row in pieces.reshape(height, -1).tolist())
+
+
+def quantize_colors(colors, levels):
+    """Snap each channel to `levels` evenly spaced values (2-256)"""
+    levels = max(2, min(256, int(levels)))
+    step = 255 / (levels - 1)
+    return (np.rint(colors / step) * step).astype(np.int64)
+
+
+def render_html_merged(char_indices, colors, chars, transparent=None):
+    """Render colored HTML with one <span> per run of same-colored cells in a row"""
+    height, width = char_indices.shape
+    red, green, blue, _ = _html_piece_tables(chars)
+    glyphs = np.array(list(chars), dtype=object)
+
+    colors = colors.astype(np.int64)
+    keys = (colors[..., 0] << 16) | (colors[..., 1] << 8) | colors[..., 2]
+    visible = np.ones((height, width), dtype=bool) if transparent is None else ~transparent
+    # Transparent cells never join a run
+    keys = np.where(visible, keys, -1)
+
+    # A run starts at column 0 or where the color changes, and ends before the next start
+    starts = np.ones((height, width), dtype=bool)
+    starts[:, 1:] = keys[:, 1:] != keys[:, :-1]
+    ends = np.ones((height, width), dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    opens = starts & visible
+    closes = ends & visible
+
+    pieces = np.full((height, width, 5), '', dtype=object)
+    pieces[opens, 0] = red[colors[opens, 0]]
+    pieces[opens, 1] = green[colors[opens, 1]]
+    pieces[opens, 2] = blue[colors[opens, 2]]
+    pieces[..., 3] = np.where(visible, glyphs[char_indices], ' ')
+    pieces[closes, 4] = '</span>'
+
+    return '\n'.join(''.join(row) for row in pieces.reshape(height, -1).tolist())
+
+
+# ANSI output: 'truecolor' (24-bit SGR 38;2) or '256' (xterm palette, SGR 38;5)
+ANSI_MODES = ('truecolor', '256')
+ANSI_RESET = '\x1b[0m'
+
+# Channel levels of the xterm 6x6x6 color cube (palette indices 16-231)
+XTERM_CUBE_LEVELS = np.array([0, 95, 135, 175, 215, 255])
+
+
+def rgb_to_xterm256(colors):
+    """Nearest xterm-256 palette index for an (..., 3) RGB array (cube or gray ramp)"""
+    colors = colors.astype(np.int64)
+    # Nearest cube level per channel
+    levels = np.abs(colors[..., None] - XTERM_CUBE_LEVELS).argmin(axis=-1)
+    cube_rgb = XTERM_CUBE_LEVELS[levels]
+    cube_index = 16 + 36 * levels[..., 0] + 6 * levels[..., 1] + levels[..., 2]
+
+    # Gray ramp 232-255 covers 8, 18, ..., 238
+    gray_step = np.clip((colors.mean(axis=-1) - 8 + 5) // 10, 0, 23).astype(np.int64)
+    gray_value = 8 + 10 * gray_step
+
+    cube_error = ((colors - cube_rgb) ** 2).sum(axis=-1)
+    gray_error = ((colors - gray_value[..., None]) ** 2).sum(axis=-1)
+    return np.where(gray_error < cube_error, 232 + gray_step, cube_index)
+
+
+def render_ansi(char_indices, colors, chars, transparent=None, mode='truecolor'):
+    """Render colored ANSI text, emitting a color escape only where the color changes in a row
+
+    Each row ends with a reset so lines can be printed independently.
+    """
+    height, width = char_indices.shape
+    glyphs = np.array(list(chars), dtype=object)
+    visible = np.ones((height, width), dtype=bool) if transparent is None else ~transparent
+
+    if mode == '256':
+        codes = rgb_to_xterm256(colors)
+        table = np.array([f'\x1b[38;5;{v}m' for v in range(256)], dtype=object)
+        keys = codes
+    else:
+        colors = colors.astype(np.int64)
+        red = np.array([f'\x1b[38;2;{v}' for v in range(256)], dtype=object)
+        green = np.array([f';{v}' for v in range(256)], dtype=object)
+        blue = np.array([f';{v}m' for v in range(256)], dtype=object)
+        keys = (colors[..., 0] << 16) | (colors[..., 1] << 8) | colors[..., 2]
+
+    # Transparent cells print a space, which the active color doesn't affect, so they
+    # carry the last visible color forward instead of breaking the run
+    last_visible = np.maximum.accumulate(np.where(visible, np.arange(width), -1), axis=1)
+    keys = np.where(last_visible >= 0, np.take_along_axis(keys, np.maximum(last_visible, 0), axis=1), -1)
+    starts = np.ones((height, width), dtype=bool)
+    starts[:, 1:] = keys[:, 1:] != keys[:, :-1]
+    opens = starts & visible
+
+    pieces = np.full((height, width, 4), '', dtype=object)
+    if mode == '256':
+        pieces[opens, 0] = table[codes[opens]]
+    else:
+        pieces[opens, 0] = red[colors[opens, 0]]
+        pieces[opens, 1] = green[colors[opens, 1]]
+        pieces[opens, 2] = blue[colors[opens, 2]]
+    pieces[..., 3] = np.where(visible, glyphs[char_indices], ' ')
+
+    return '\n'.join(''.join(row) + ANSI_RESET for row in pieces.reshape(height, -1).tolist())
@@ -0,0 +1,149 @@
+"""
+Batch Conversion Module
+Converts a directory or glob of images in parallel and writes the results through FileHandler
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+
+from .cancellation import raise_if_cancelled
+from .worker_pool import spawn_executor, worker_processor
+
+# Still-image formats picked up from a directory (GIFs go through the animated pipeline)
+BATCH_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp', '.tif', '.tiff')
+
+BATCH_FORMATS = ('txt', 'html')
+
+def collect_inputs(source, recursive=False):
+    """Sorted image paths from a directory, a glob pattern, or a single file"""
+    if os.path.isdir(source):
+        pattern = os.path.join(source, '**', '*') if recursive else os.path.join(source, '*')
+        candidates = glob.glob(pattern, recursive=recursive)
+    else:
+        candidates = glob.glob(source, recursive=True)
+
+    return sorted(
+        path for path in candidates
+        if os.path.isfile(path) and os.path.splitext(path)[1].lower() in BATCH_EXTENSIONS
+    )
+
+
+def batch_options(options, output_format):
+    """Conversion options for a batch: plain text output unless colors were asked for"""
+    resolved = dict(options)
+    resolved.setdefault('colored', output_format == 'html')
+    return resolved
+
+
+def _convert_batch_job(job):
+    """Convert one file, returns (path, ascii or None, error or None, seconds)"""
+    path, options = job
+    processor = worker_processor()
+    start = time.perf_counter()
+    try:
+        return path, processor.process_and_convert(path, options), None, time.perf_counter() - start
+    except Exception as e:
+        return path, None, str(e), time.perf_counter() - start
+
+
+def _output_filename(path, output_format, used_names):
+    """Output file name for a source path, unique within this batch"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = f'{stem}.{output_format}'
+    counter = 1
+    while name in used_names:
+        name = f'{stem}_{counter}.{output_format}'
+        counter += 1
+    used_names.add(name)
+    return name
+
+
+def _iter_results(jobs, workers, cancel_token, pool=None):
+    """Yield job results as they complete, on a process pool when workers > 1"""
+    if pool is not None and len(jobs) > 1:
+        yield from _iter_pool_results(pool.executor, jobs, pool.workers * 2, cancel_token)
+        return
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            raise_if_cancelled(cancel_token)
+            yield _convert_batch_job(job)
+        return
+
+    with spawn_executor(workers) as executor:
+        yield from _iter_pool_results(executor, jobs, workers * 2, cancel_token)
+
+
+def _iter_pool_results(executor, jobs, window, cancel_token):
+    """Submit jobs to executor keeping at most `window` in flight, yielding results as they complete"""
+    # Bounded window so thousands of files don't all sit in the queue at once
+    queued = iter(jobs)
+    pending = set()
+    try:
+        while True:
+            while len(pending) < window:
+                job = next(queued, None)
+                if job is None:
+                    break
+                pending.add(executor.submit(_convert_batch_job, job))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+            raise_if_cancelled(cancel_token)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def run_batch(paths, options, file_handler, output_format='txt', workers=None, cancel_token=None, on_result=None,
+              pool=None):
+    """Convert every path and save it through file_handler, returns a summary dict
+
+    on_result(done, total, path, error) is called after each file; cancel_token
+    (optional CancelToken) is checked between files. A WorkerPool passed as pool
+    is used instead of starting a new process pool (its size overrides workers).
+    """
+    if output_format not in BATCH_FORMATS:
+        raise ValueError(f"Unknown batch format: {output_format}")
+
+    workers = pool.workers if pool is not None else max(1, int(workers or os.cpu_count() or 1))
+    options = batch_options(options, output_format)
+    save = file_handler.save_ascii_html if output_format == 'html' else file_handler.save_ascii_text
+
+    # Names are fixed up front in path order, so a.png / a.jpg always map to the
+    # same a.txt / a_1.txt whatever order the workers finish in
+    used_names = set()
+    filenames = {path: _output_filename(path, output_format, used_names) for path in sorted(set(paths))}
+    latencies = []
+    outputs = []
+    errors = []
+    start = time.perf_counter()
+
+    jobs = [(path, options) for path in paths]
+    for done, (path, ascii_art, error, seconds) in enumerate(_iter_results(jobs, workers, cancel_token, pool), 1):
+        latencies.append(seconds)
+        if error is None:
+            outputs.append(save(ascii_art, filenames[path]))
+        else:
+            errors.append({'path': path, 'error': error})
+        if on_result:
+            on_result(done, len(paths), path, error)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'files': len(paths),
+        'converted': len(outputs),
+        'failed': len(errors),
+        'errors': errors,
+        'outputs': outputs,
+        'workers': workers,
+        'seconds': elapsed,
+        'filesPerSecond': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50Ms': float(np.percentile(latencies, 50)) * 1000 if latencies else 0.0,
+        'p95Ms': float(np.percentile(latencies, 95)) * 1000 if latencies else 0.0,
+    }
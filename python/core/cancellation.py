@@ -0,0 +1,32 @@
+"""
+Cancellation Module
+Cooperative cancellation tokens checked by processors at stage, frame and row boundaries
+"""
+
+import threading
+
+
+class CancelledError(Exception):
+    """Raised inside a conversion when its request has been cancelled"""
+
+
+class CancelToken:
+    def __init__(self):
+        self.reason = None
+        self._event = threading.Event()
+
+    def cancel(self, reason='cancelled'):
+        """Ask the conversion holding this token to stop at its next checkpoint"""
+        if not self._event.is_set():
+            self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+def raise_if_cancelled(cancel_token):
+    """Checkpoint: raise CancelledError if the (optional) token was cancelled"""
+    if cancel_token is not None and cancel_token.cancelled:
+        raise CancelledError("Request cancelled")
@@ -0,0 +1,86 @@
+"""
+Dithering Module
+Vectorized error-diffusion and ordered dithering to pure black/white
+"""
+
+import numpy as np
+
+from .cancellation import raise_if_cancelled
+
+# Pixels strictly above this become white during error diffusion
+DIFFUSION_THRESHOLD = 128
+
+DITHER_METHODS = ('floyd-steinberg', 'bayer')
+
+# Error diffusion checks for cancellation every this many diagonals
+CANCEL_CHECK_INTERVAL = 64
+
+
+def floyd_steinberg(gray_pixels, cancel_token=None):
+    """Floyd-Steinberg dither a 2D 0-255 array, returns a boolean mask of black pixels
+
+    Each pixel only depends on its left neighbour and the three pixels above it,
+    so every anti-diagonal t = x + 2y can be quantized at once. Errors are
+    accumulated in float32 in the same order as the classic scan-line loop,
+    which keeps the result bit-identical to it.
+    """
+    height, width = gray_pixels.shape
+    if height == 0 or width == 0:
+        return np.zeros((height, width), dtype=bool)
+
+    # One padding column on each side and one padding row below swallow
+    # the error that the scan-line version drops at the borders
+    stride = width + 2
+    padded = np.zeros((height + 1, stride), dtype=np.float32)
+    padded[:height, 1:width + 1] = gray_pixels
+    flat = padded.ravel()
+
+    rows = np.arange(height)
+    for t in range(width + 2 * (height - 1)):
+        if t % CANCEL_CHECK_INTERVAL == 0:
+            raise_if_cancelled(cancel_token)
+        cols = t - 2 * rows
+        valid = (cols >= 0) & (cols < width)
+        idx = rows[valid] * stride + cols[valid] + 1
+
+        old = flat[idx]
+        new = np.where(old > DIFFUSION_THRESHOLD, np.float32(255), np.float32(0))
+        flat[idx] = new
+        error = old - new
+
+        # Row below first, then the right neighbour (matches scan-line order)
+        below = idx + stride
+        flat[below - 1] += error * 3 / 16
+        flat[below] += error * 5 / 16
+        flat[below + 1] += error * 1 / 16
+        flat[idx + 1] += error * 7 / 16
+
+    return padded[:height, 1:width + 1] == 0
+
+
+def bayer_matrix(size):
+    """Normalized Bayer threshold matrix (size must be a power of two)"""
+    matrix = np.zeros((1, 1), dtype=np.int64)
+    while matrix.shape[0] < size:
+        matrix = np.block([
+            [4 * matrix, 4 * matrix + 2],
+            [4 * matrix + 3, 4 * matrix + 1],
+        ])
+    return (matrix + 0.5) / matrix.size
+
+
+def ordered_dither(gray_pixels, size=8):
+    """Ordered (Bayer) dither a 2D 0-255 array, returns a boolean mask of black pixels"""
+    height, width = gray_pixels.shape
+    thresholds = bayer_matrix(size) * 255
+    tiled = np.tile(thresholds, (height // size + 1, width // size + 1))[:height, :width]
+    return gray_pixels < tiled
+
+
+def dither(gray_pixels, method='floyd-steinberg', cancel_token=None):
+    """Dither with the named method, returns a boolean mask of black pixels"""
+    if method == 'bayer':
+        return ordered_dither(gray_pixels)
+    if method == 'floyd-steinberg':
+        return floyd_steinberg(gray_pixels, cancel_token)
+    raise ValueError(f"Unknown dither method: {method}")
@@ -1,16 +1,44 @@
 """
 File Handler Module
-Manages saving ASCII art to files
+Manages saving ASCII art to files and the conversion history
 """
 
 import os
 import json
+import sqlite3
+import zlib
+from contextlib import closing
 from datetime import datetime
 
+from .metrics import measure
+
+# History lives in SQLite: small metadata rows plus zlib-compressed payload blobs,
+# so saving an entry costs O(entry) instead of rewriting the whole history
+HISTORY_FILE = 'history.db'
+LEGACY_HISTORY_FILE = 'history.json'
+MAX_HISTORY_ENTRIES = 50
+HISTORY_COMPRESSION_LEVEL = 1
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    preview TEXT NOT NULL,
+    options TEXT NOT NULL,
+    is_gif INTEGER NOT NULL,
+    frame_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS history_payload (
+    entry_id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
 
 class FileHandler:
     def __init__(self, output_dir='output'):
         self.output_dir = output_dir
+        self._initialized_dbs = set()
         self.ensure_output_dir()
     
     def ensure_output_dir(self):
@@ -70,65 +98,190 @@ class FileHandler:
         
         return filepath
     
-    def save_history_entry(self, ascii_art, options, history_file='history.json', is_gif=False, frames=None, delays=None):
-        """Save entry to history"""
-        history_path = os.path.join(self.output_dir, history_file)
-        
-        # Load existing history
-        history = []
-        if os.path.exists(history_path):
-            try:
-                with open(history_path, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            except:
-                history = []
-        
-        # Add new entry
+    def _history_db_path(self, history_file):
+        """History database path, creating and migrating it on first use"""
+        db_path = os.path.join(self.output_dir, history_file)
+        if db_path in self._initialized_dbs:
+            return db_path
+        
+        with closing(sqlite3.connect(db_path)) as conn, conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(HISTORY_SCHEMA)
+            
+            # One-time import of the old rewrite-everything history.json
+            legacy_path = os.path.join(self.output_dir, LEGACY_HISTORY_FILE)
+            empty = conn.execute('SELECT COUNT(*) FROM history').fetchone()[0] == 0
+            if empty and os.path.exists(legacy_path):
+                try:
+                    with open(legacy_path, 'r', encoding='utf-8') as f:
+                        legacy_history = json.load(f)
+                except (OSError, ValueError):
+                    legacy_history = []
+                for entry in legacy_history[-MAX_HISTORY_ENTRIES:]:
+                    self._insert_history_entry(conn, entry)
+                os.replace(legacy_path, legacy_path + '.migrated')
+        
+        self._initialized_dbs.add(db_path)
+        return db_path
+    
+    def _insert_history_entry(self, conn, entry):
+        """Insert one entry: metadata row plus compressed payload blob"""
+        cursor = conn.execute(
+            'INSERT INTO history (timestamp, preview, options, is_gif, frame_count) VALUES (?, ?, ?, ?, ?)',
+            (
+                entry.get('timestamp', ''),
+                entry.get('preview', ''),
+                json.dumps(entry.get('options', {})),
+                int(bool(entry.get('isGif', False))),
+                len(entry.get('frames') or [])
+            )
+        )
+        payload = {'ascii': entry.get('ascii', '')}
+        if entry.get('encoding'):
+            payload['encoding'] = entry['encoding']
+        if entry.get('frames'):
+            payload['frames'] = entry['frames']
+            payload['delays'] = entry.get('delays', [])
+        blob = zlib.compress(json.dumps(payload).encode('utf-8'), HISTORY_COMPRESSION_LEVEL)
+        conn.execute('INSERT INTO history_payload (entry_id, data) VALUES (?, ?)', (cursor.lastrowid, blob))
+        return cursor.lastrowid
+    
+    def save_history_entry(self, ascii_art, options, history_file=HISTORY_FILE, is_gif=False, frames=None, delays=None,
+                           encoding=None, thumbnail='', metrics=None):
+        """Save entry to history
+
+        encoding='compact' marks ascii/frames as packed wire_format grids. thumbnail
+        is the gallery preview (wire_format.grid_thumbnail of the result). The write
+        is timed as the 'history_save' stage of metrics (optional ConversionMetrics).
+        """
+        with measure(metrics, 'history_save'):
+            return self._save_history_entry(ascii_art, options, history_file, is_gif, frames, delays, encoding,
+                                            thumbnail)
+    
+    def _save_history_entry(self, ascii_art, options, history_file, is_gif, frames, delays, encoding, thumbnail):
+        history_path = self._history_db_path(history_file)
+        
         entry = {
             'timestamp': datetime.now().isoformat(),
             'ascii': ascii_art,  # Store full ASCII art (or first frame for GIFs)
-            'preview': ascii_art[:500],  # Store preview for gallery display
+            'preview': thumbnail,  # Small whole-row rendering for gallery display
             'options': options,
             'isGif': is_gif
         }
+        if encoding == 'compact':
+            entry['encoding'] = encoding
         
         # Add GIF-specific data if applicable
         if is_gif and frames and delays:
             entry['frames'] = frames
             entry['delays'] = delays
         
-        history.append(entry)
+        with closing(sqlite3.connect(history_path)) as conn, conn:
+            self._insert_history_entry(conn, entry)
+            
+            # Keep last 50 entries
+            cutoff = conn.execute(
+                'SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?', (MAX_HISTORY_ENTRIES,)
+            ).fetchone()
+            if cutoff:
+                conn.execute('DELETE FROM history WHERE id <= ?', cutoff)
+                conn.execute('DELETE FROM history_payload WHERE entry_id <= ?', cutoff)
         
-        # Keep last 50 entries
-        history = history[-50:]
+        return history_path
+    
+    def load_history(self, history_file=HISTORY_FILE):
+        """Load all history entries, oldest first, in the original JSON entry format"""
+        history_path = self._history_db_path(history_file)
         
-        # Save history
-        with open(history_path, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2)
+        with closing(sqlite3.connect(history_path)) as conn:
+            rows = conn.execute(
+                'SELECT h.timestamp, h.preview, h.options, h.is_gif, p.data '
+                'FROM history h JOIN history_payload p ON p.entry_id = h.id ORDER BY h.id'
+            ).fetchall()
         
-        return history_path
+        return [self._row_to_entry(row) for row in rows]
     
-    def delete_history_entry(self, index, history_file='history.json'):
+    def _row_to_entry(self, row):
+        """Rebuild a full entry from a (timestamp, preview, options, is_gif, blob) row"""
+        timestamp, preview, options, is_gif, blob = row
+        payload = json.loads(zlib.decompress(blob).decode('utf-8'))
+        entry = {
+            'timestamp': timestamp,
+            'ascii': payload.get('ascii', ''),
+            'preview': preview,
+            'options': json.loads(options),
+            'isGif': bool(is_gif)
+        }
+        if 'frames' in payload:
+            entry['frames'] = payload['frames']
+            entry['delays'] = payload['delays']
+        if 'encoding' in payload:
+            entry['encoding'] = payload['encoding']
+        return entry
+    
+    def list_history(self, offset=0, limit=None, history_file=HISTORY_FILE):
+        """Page of history metadata and previews (no full payloads), oldest first
+
+        Returns (entries, total). Each entry carries its `index` for
+        get_history_entry / delete_history_entry.
+        """
+        history_path = self._history_db_path(history_file)
+        offset = max(0, int(offset or 0))
+        
+        with closing(sqlite3.connect(history_path)) as conn:
+            total = conn.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+            rows = conn.execute(
+                'SELECT timestamp, preview, options, is_gif, frame_count FROM history '
+                'ORDER BY id LIMIT ? OFFSET ?',
+                (-1 if limit is None else max(0, int(limit)), offset)
+            ).fetchall()
+        
+        entries = []
+        for position, (timestamp, preview, options, is_gif, frame_count) in enumerate(rows):
+            entries.append({
+                'index': offset + position,
+                'timestamp': timestamp,
+                'preview': preview,
+                'options': json.loads(options),
+                'isGif': bool(is_gif),
+                'frameCount': frame_count
+            })
+        
+        return entries, total
+    
+    def get_history_entry(self, index, history_file=HISTORY_FILE):
+        """Full history entry (ascii, frames, delays) by index, or None"""
+        if index < 0:
+            return None
+        history_path = self._history_db_path(history_file)
+        
+        with closing(sqlite3.connect(history_path)) as conn:
+            row = conn.execute(
+                'SELECT h.timestamp, h.preview, h.options, h.is_gif, p.data '
+                'FROM history h JOIN history_payload p ON p.entry_id = h.id '
+                'ORDER BY h.id LIMIT 1 OFFSET ?', (index,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        entry = self._row_to_entry(row)
+        entry['index'] = index
+        return entry
+    
+    def delete_history_entry(self, index, history_file=HISTORY_FILE):
         """Delete entry from history by index"""
-        history_path = os.path.join(self.output_dir, history_file)
-        
-        # Load existing history
-        history = []
-        if os.path.exists(history_path):
-            try:
-                with open(history_path, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            except:
-                return False
+        history_path = self._history_db_path(history_file)
         
-        # Delete entry if index is valid
-        if 0 <= index < len(history):
-            history.pop(index)
+        with closing(sqlite3.connect(history_path)) as conn, conn:
+            # Index counts from the oldest entry, like the old history.json list
+            row = conn.execute(
+                'SELECT id FROM history ORDER BY id LIMIT 1 OFFSET ?', (index,)
+            ).fetchone() if index >= 0 else None
             
-            # Save updated history
-            with open(history_path, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2)
+            if row is None:
+                return False
             
+            conn.execute('DELETE FROM history WHERE id = ?', row)
+            conn.execute('DELETE FROM history_payload WHERE entry_id = ?', row)
             return True
-        
-        return False
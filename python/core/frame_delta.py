@@ -0,0 +1,80 @@
+"""
+Frame Delta Module
+Duplicate-frame detection and index/row-delta encoding of GIF results
+"""
+
+import hashlib
+
+# A frame is sent as a row delta only when at most this fraction of its rows changed
+DELTA_MAX_CHANGED_ROWS = 0.5
+
+
+def frame_key(frame):
+    """Content hash of a decoded PIL frame (mode, size and pixels)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{frame.mode}:{frame.size}'.encode())
+    digest.update(frame.tobytes())
+    return digest.digest()
+
+
+def dedupe_frames(frames):
+    """Split rendered frames into (unique frames, index of each frame into the unique list)"""
+    unique = []
+    positions = {}
+    frame_index = []
+    for frame in frames:
+        position = positions.get(frame)
+        if position is None:
+            position = positions[frame] = len(unique)
+            unique.append(frame)
+        frame_index.append(position)
+    return unique, frame_index
+
+
+def row_delta(previous, frame, max_changed=DELTA_MAX_CHANGED_ROWS):
+    """[[row, text], ...] turning previous into frame, or None when a full frame is smaller"""
+    old_rows = previous.split('\n')
+    new_rows = frame.split('\n')
+    if len(old_rows) != len(new_rows):
+        return None
+    changed = [[row, text] for row, (old, text) in enumerate(zip(old_rows, new_rows)) if old != text]
+    if len(changed) > len(new_rows) * max_changed:
+        return None
+    return changed
+
+
+def delta_encode(frames):
+    """Replace each frame that is close to its predecessor by {'base': i - 1, 'rows': [[row, text], ...]}"""
+    encoded = []
+    for position, frame in enumerate(frames):
+        rows = row_delta(frames[position - 1], frame) if position else None
+        encoded.append(frame if rows is None else {'base': position - 1, 'rows': rows})
+    return encoded
+
+
+def apply_row_delta(base, rows):
+    """Rebuild a frame from its base frame and changed rows"""
+    lines = base.split('\n')
+    for row, text in rows:
+        lines[row] = text
+    return '\n'.join(lines)
+
+
+def pack_frames(frames, delta=False):
+    """Deduplicated (optionally row-delta) wire form of a frame list
+
+    Returns {'frames': unique frames, 'frameIndex': per-frame index into them};
+    with delta, unique frames may be {'base', 'rows'} objects (see delta_encode).
+    """
+    unique, frame_index = dedupe_frames(frames)
+    return {'frames': delta_encode(unique) if delta else unique, 'frameIndex': frame_index}
+
+
+def unpack_frames(frames, frame_index):
+    """Inverse of pack_frames: the full frame list"""
+    resolved = []
+    for frame in frames:
+        if isinstance(frame, dict):
+            frame = apply_row_delta(resolved[frame['base']], frame['rows'])
+        resolved.append(frame)
+    return [resolved[position] for position in frame_index]
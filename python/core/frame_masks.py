@@ -0,0 +1,87 @@
+"""
+Frame Masks Module
+Background-removal masks for animated frames: reduced-resolution inference, reused across near-identical frames
+"""
+
+import time
+
+import numpy as np
+from PIL import Image
+
+from .image_processor import _get_rembg
+
+# u2netp works on 320x320 inputs, so inferring on larger frames only adds pre/post-processing
+MASK_INFERENCE_WIDTH = 320
+
+# Mean absolute grayscale difference (0-1) under which the previous frame's mask is reused
+MASK_REUSE_THRESHOLD = 0.02
+
+# Frames per pool job in parallel mode; masks are only reused within a batch
+MASK_BATCH_FRAMES = 8
+
+# Width of the grayscale thumbnail used to compare consecutive frames
+_DIFF_WIDTH = 64
+
+
+def _diff_thumbnail(frame):
+    """Small float grayscale copy of a frame for cheap frame-to-frame comparison"""
+    width, height = frame.size
+    size = (_DIFF_WIDTH, max(1, height * _DIFF_WIDTH // width))
+    return np.asarray(frame.convert('L').resize(size, Image.BILINEAR), dtype=np.float32) / 255.0
+
+
+class FrameMasker:
+    """Computes alpha masks for a sequence of frames, skipping inference for near-identical ones
+
+    Keep one instance per ordered run of frames: reuse compares each frame to the
+    last one that went through inference.
+    """
+
+    def __init__(self, threshold=MASK_REUSE_THRESHOLD, inference_width=MASK_INFERENCE_WIDTH):
+        self.threshold = threshold
+        self.inference_width = inference_width
+        self._reference = None  # thumbnail of the frame the current mask came from
+        self._mask = None
+        self.timings = []  # per frame: (reused, milliseconds)
+
+    def mask_for(self, frame):
+        """Alpha mask ('L', frame size) for the frame"""
+        start = time.perf_counter()
+        thumbnail = _diff_thumbnail(frame)
+        reused = (
+            self._mask is not None
+            and self._reference.shape == thumbnail.shape
+            and float(np.abs(thumbnail - self._reference).mean()) < self.threshold
+        )
+        if not reused:
+            self._mask = self._infer(frame)
+            self._reference = thumbnail
+        mask = self._mask if self._mask.size == frame.size else self._mask.resize(frame.size, Image.BILINEAR)
+        self.timings.append((reused, (time.perf_counter() - start) * 1000))
+        return mask
+
+    def _infer(self, frame):
+        """Run rembg on a downscaled copy and scale the mask back to the frame size"""
+        remove_func, session = _get_rembg()
+        width, height = frame.size
+        small = frame
+        if width > self.inference_width:
+            small = frame.resize((self.inference_width, max(1, height * self.inference_width // width)), Image.BILINEAR)
+        mask = remove_func(small, session=session, only_mask=True)
+        if mask.mode != 'L':
+            mask = mask.convert('L')
+        return mask.resize(frame.size, Image.BILINEAR) if mask.size != frame.size else mask
+
+
+def mask_stats(timings):
+    """Summary of FrameMasker timings: inference vs reuse counts and per-frame milliseconds"""
+    inferred = [ms for reused, ms in timings if not reused]
+    reused = [ms for was_reused, ms in timings if was_reused]
+    return {
+        'frames': len(timings),
+        'inferences': len(inferred),
+        'reused': len(reused),
+        'inferenceMs': sum(inferred),
+        'reuseMs': sum(reused),
+        'frameMs': [round(ms, 2) for _, ms in timings],
+    }
@@ -1,100 +1,335 @@
 """
 GIF Processing Module
-Handles animated GIF conversion to ASCII
+Handles animated GIF conversion to ASCII (also animated WebP/APNG and image-sequence directories)
 """
 
-from PIL import Image
-from .image_processor import ImageProcessor
+import os
+from collections import deque
+from itertools import chain, islice
+
+from .animation_source import iter_animation_frames
+from .cancellation import CancelledError, raise_if_cancelled
+from .frame_delta import frame_key
+from .frame_masks import MASK_BATCH_FRAMES, MASK_INFERENCE_WIDTH, MASK_REUSE_THRESHOLD, FrameMasker, mask_stats
+from .image_processor import RESIZE_REDUCING_GAP, ImageProcessor
+from .metrics import ConversionMetrics, measure
+from .wire_format import grid_thumbnail
+from .worker_pool import spawn_executor, worker_processor
+
+# GIFs with fewer frames than this are always converted serially
+MIN_PARALLEL_FRAMES = 16
+
+def resolve_worker_count(options):
+    """Number of worker processes requested by options (1 = serial)"""
+    if not options.get('parallel', False):
+        return 1
+    workers = options.get('workers') or os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def convert_frame(processor, frame, options, masker=None, metrics=None):
+    """Run the image pipeline on a single frame using the given processor
+
+    With a FrameMasker, background removal uses its (possibly reused) mask.
+    metrics (optional ConversionMetrics) sums each stage over frames.
+    """
+    # Set frame as processor's image
+    processor.image = frame
+    processor.original_image = frame
+    
+    # Apply same processing as images
+    if options.get('removeBackground', False):
+        with measure(metrics, 'remove_background'):
+            if masker is not None:
+                processor.apply_alpha_mask(masker.mask_for(frame))
+            else:
+                processor.remove_background()
+    
+    width = options.get('width', 120)
+    ratio = options.get('ratio')
+    keep_original = options.get('keepOriginal', False)
+    if options.get('resizeFirst', False) and not keep_original:
+        with measure(metrics, 'resize'):
+            processor.resize_image(width, ratio, keep_original, reducing_gap=RESIZE_REDUCING_GAP)
+        with measure(metrics, 'adjust'):
+            processor.apply_adjustments(options)
+    else:
+        with measure(metrics, 'adjust'):
+            processor.apply_adjustments(options)
+        with measure(metrics, 'resize'):
+            processor.resize_image(width, ratio, keep_original)
+    
+    charset = options.get('charset', 'detailed')
+    color_scheme = options.get('colorScheme', 'original')
+    with measure(metrics, 'render'):
+        return processor.convert_to_ascii(
+            charset, colored=options.get('colored', True), color_scheme=color_scheme,
+            merge_spans=options.get('mergeSpans', False),
+            color_levels=options.get('colorLevels'),
+            compact=options.get('compact', False),
+            ansi=options.get('ansi')
+        )
+
+
+def uses_fast_masks(options):
+    """Whether options ask for reduced-resolution, reused background-removal masks"""
+    return options.get('removeBackground', False) and options.get('fastMask', False)
+
+
+def make_masker(options):
+    """FrameMasker configured from maskThreshold / maskWidth options"""
+    return FrameMasker(
+        threshold=options.get('maskThreshold', MASK_REUSE_THRESHOLD),
+        inference_width=options.get('maskWidth') or MASK_INFERENCE_WIDTH
+    )
+
+
+def _convert_frame_job(job):
+    """Pool entry point: convert one (frame, options) pair, returns (frame, stage timings)"""
+    frame, options = job
+    metrics = ConversionMetrics()
+    return convert_frame(worker_processor(), frame, options, metrics=metrics), metrics.stages
+
+
+def _convert_frame_batch_job(job):
+    """Pool entry point: convert consecutive frames sharing one FrameMasker
+
+    Returns (frames, mask timings, thumbnail of the first frame, stage timings).
+    """
+    frames, options = job
+    processor = worker_processor()
+    masker = make_masker(options)
+    metrics = ConversionMetrics()
+    ascii_frames = []
+    thumbnail = ''
+    for frame in frames:
+        ascii_frames.append(convert_frame(processor, frame, options, masker, metrics))
+        if not thumbnail:
+            thumbnail = grid_thumbnail(processor.last_grid)
+    return ascii_frames, masker.timings, thumbnail, metrics.stages
+
+
+def _add_stages(metrics, stages):
+    """Record stage timings measured in a worker process (ConversionMetrics.stages)"""
+    if metrics is None:
+        return
+    for name, entry in stages.items():
+        metrics.add(name, entry['ms'], entry['calls'])
+
+
+def _batched(items, size):
+    """Group an iterator into lists of up to size items"""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_gif_frames(path, options=None):
+    """Decode frames one at a time, yielding (RGB frame, delay in ms)
+
+    Accepts anything iter_animation_frames does; options may decimate frames.
+    """
+    return iter_animation_frames(path, options)
+
+
+def _ordered_window_map(executor, func, items, window):
+    """Like executor.map, but keeps at most `window` items in flight
+
+    When the consumer stops early (e.g. a cancelled request closes the
+    generator), jobs not yet started are cancelled so a shared pool is free
+    for the next request.
+    """
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
 
 
 class GifProcessor:
-    def __init__(self):
+    def __init__(self, pool=None):
         self.frames = []
         self.delays = []
         self.processor = ImageProcessor()
+        self.pool = pool  # Optional WorkerPool reused instead of a per-GIF process pool
+        self.mask_timings = []  # FrameMasker (reused, ms) per frame of the last fastMask conversion
+        self.duplicate_frames = 0  # Source frames the last dedupe conversion did not render
+        self.thumbnail = ''  # Gallery thumbnail of the first frame of the last conversion
     
     def load_gif(self, path):
-        """Load GIF frames and delays"""
-        with Image.open(path) as gif:
-            self.frames = []
-            self.delays = []
-            
-            # Count total frames
-            total_frames = 0
-            try:
-                while True:
-                    gif.seek(total_frames)
-                    total_frames += 1
-            except EOFError:
-                pass
-            
-            gif.seek(0)  # Reset to first frame
-            
-            # Extract frames and delays
-            for frame_index in range(total_frames):
-                gif.seek(frame_index)
-                
-                # Get frame delay in milliseconds (default 100ms)
-                delay = gif.info.get('duration', 100)
-                self.delays.append(delay)
-                
-                # Convert frame to RGB
-                frame = gif.copy()
-                if frame.mode != 'RGB':
-                    frame = frame.convert('RGB')
-                self.frames.append(frame)
+        """Load all GIF frames and delays into memory"""
+        self.frames = []
+        self.delays = []
+        for frame, delay in iter_gif_frames(path):
+            self.frames.append(frame)
+            self.delays.append(delay)
         
         return len(self.frames)
     
     def convert_frames_to_ascii(self, options):
-        """Convert all frames to ASCII"""
-        ascii_frames = []
+        """Convert all loaded frames to ASCII"""
+        return list(self.iter_converted(iter(self.frames), options))
+    
+    def _convert_local(self, frame, options, masker=None, metrics=None):
+        """convert_frame in this process, keeping the first frame's thumbnail"""
+        ascii_frame = convert_frame(self.processor, frame, options, masker, metrics)
+        if not self.thumbnail:
+            self.thumbnail = grid_thumbnail(self.processor.last_grid)
+        return ascii_frame
+    
+    def iter_converted(self, frames, options, metrics=None):
+        """Convert a frame iterator to ASCII frames lazily, preserving order
+
+        Stage timings of frames converted in worker processes are added to
+        metrics as well (memory is only measured in this process). The first frame's gallery thumbnail is left in self.thumbnail.
+        """
+        self.mask_timings = []
+        self.thumbnail = ''
+        if uses_fast_masks(options):
+            yield from self._iter_converted_masked(frames, options, metrics)
+            return
         
-        for frame in self.frames:
-            # Set frame as processor's image
-            self.processor.image = frame
-            self.processor.original_image = frame.copy()
-            
-            # Apply same processing as images
-            if options.get('removeBackground', False):
-                self.processor.remove_background()
-            
-            brightness = options.get('brightness', 0)
-            if brightness != 0:
-                self.processor.adjust_brightness(brightness)
-            
-            contrast = options.get('contrast', 100)
-            if contrast != 100:
-                self.processor.adjust_contrast(contrast)
-            
-            if options.get('invert', False):
-                self.processor.invert_colors()
-            
-            width = options.get('width', 120)
-            ratio = options.get('ratio')
-            keep_original = options.get('keepOriginal', False)
-            self.processor.resize_image(width, ratio, keep_original)
-            
-            charset = options.get('charset', 'detailed')
-            color_scheme = options.get('colorScheme', 'original')
-            ascii_frame = self.processor.convert_to_ascii(charset, colored=True, color_scheme=color_scheme)
-            ascii_frames.append(ascii_frame)
+        workers = resolve_worker_count(options)
+        if workers <= 1:
+            for frame in frames:
+                yield self._convert_local(frame, options, metrics=metrics)
+            return
+        
+        # Small GIFs are faster serially than paying for worker startup,
+        # so look ahead just far enough to decide
+        head = list(islice(frames, MIN_PARALLEL_FRAMES))
+        if len(head) < MIN_PARALLEL_FRAMES:
+            for frame in head:
+                yield self._convert_local(frame, options, metrics=metrics)
+            return
+        
+        # The first frame is converted here (it also gives the thumbnail) while
+        # the rest go to the workers; a bounded window keeps memory flat
+        yield self._convert_local(head[0], options, metrics=metrics)
+        jobs = ((frame, options) for frame in chain(head[1:], frames))
+        if self.pool is not None:
+            # Long-lived workers: no startup cost, rembg already warm
+            results = _ordered_window_map(self.pool.executor, _convert_frame_job, jobs, self.pool.workers * 2)
+            for ascii_frame, stages in results:
+                _add_stages(metrics, stages)
+                yield ascii_frame
+            return
+        with spawn_executor(workers) as executor:
+            for ascii_frame, stages in _ordered_window_map(executor, _convert_frame_job, jobs, workers * 2):
+                _add_stages(metrics, stages)
+                yield ascii_frame
+    
+    def _iter_converted_masked(self, frames, options, metrics=None):
+        """iter_converted for fastMask: masks are reused between near-identical consecutive frames
+
+        Serially one FrameMasker sees every frame; in parallel each pool job gets
+        MASK_BATCH_FRAMES consecutive frames and its own masker.
+        """
+        workers = resolve_worker_count(options)
+        if workers <= 1:
+            masker = make_masker(options)
+            self.mask_timings = masker.timings
+            for frame in frames:
+                yield self._convert_local(frame, options, masker, metrics)
+            return
+        
+        jobs = ((batch, options) for batch in _batched(frames, MASK_BATCH_FRAMES))
+        if self.pool is not None:
+            results = _ordered_window_map(self.pool.executor, _convert_frame_batch_job, jobs, self.pool.workers * 2)
+            for ascii_frames, timings, thumbnail, stages in results:
+                self.mask_timings.extend(timings)
+                self.thumbnail = self.thumbnail or thumbnail
+                _add_stages(metrics, stages)
+                yield from ascii_frames
+            return
+        with spawn_executor(workers) as executor:
+            results = _ordered_window_map(executor, _convert_frame_batch_job, jobs, workers * 2)
+            for ascii_frames, timings, thumbnail, stages in results:
+                self.mask_timings.extend(timings)
+                self.thumbnail = self.thumbnail or thumbnail
+                _add_stages(metrics, stages)
+                yield from ascii_frames
+    
+    def mask_stats(self):
+        """Inference / reuse summary of the last fastMask conversion, or None"""
+        return mask_stats(self.mask_timings) if self.mask_timings else None
+    
+    def iter_ascii_frames(self, path, options, cancel_token=None, metrics=None):
+        """Stream (ascii_frame, delay) pairs: decode, process and convert one frame at a time
+
+        cancel_token (optional CancelToken) is checked before each frame is decoded.
+        With the dedupe option, a frame whose pixels match an earlier one is not
+        rendered again; the earlier result is yielded in its place. metrics
+        (optional ConversionMetrics) also times decoding.
+        """
+        dedupe = options.get('dedupe', False)
+        plan = deque()  # per source frame: (delay, position of an earlier rendered frame or None)
+        positions = {}
+        rendered = []
+        self.duplicate_frames = 0
+        
+        def frames():
+            decoded = iter_gif_frames(path, options)
+            while True:
+                with measure(metrics, 'decode'):
+                    item = next(decoded, None)
+                if item is None:
+                    return
+                frame, delay = item
+                raise_if_cancelled(cancel_token)
+                if dedupe:
+                    key = frame_key(frame)
+                    if key in positions:
+                        self.duplicate_frames += 1
+                        plan.append((delay, positions[key]))
+                        continue
+                    positions[key] = len(positions)
+                plan.append((delay, None))
+                yield frame
         
-        return ascii_frames
+        def repeats():
+            while plan and plan[0][1] is not None:
+                delay, position = plan.popleft()
+                yield rendered[position], delay
+        
+        for ascii_frame in self.iter_converted(frames(), options, metrics):
+            yield from repeats()
+            delay, _ = plan.popleft()
+            if dedupe:
+                rendered.append(ascii_frame)
+            yield ascii_frame, delay
+        yield from repeats()
     
-    def process_and_convert(self, path, options):
+    def process_and_convert(self, path, options, cancel_token=None, metrics=None):
         """Complete GIF processing pipeline"""
         try:
-            frame_count = self.load_gif(path)
-            ascii_frames = self.convert_frames_to_ascii(options)
+            ascii_frames = []
+            self.delays = []
+            for ascii_frame, delay in self.iter_ascii_frames(path, options, cancel_token, metrics):
+                ascii_frames.append(ascii_frame)
+                self.delays.append(delay)
             
             return {
                 'type': 'gif',
                 'frames': ascii_frames,
                 'delays': self.delays,
-                'frame_count': frame_count,
-                'preview': ascii_frames[0] if ascii_frames else ''
+                'frame_count': len(ascii_frames),
+                'preview': ascii_frames[0] if ascii_frames else '',
+                'thumbnail': self.thumbnail,
+                'mask_stats': self.mask_stats(),
+                'duplicate_frames': self.duplicate_frames
             }
             
+        except CancelledError:
+            raise
         except Exception as e:
             raise Exception(f"GIF processing error: {str(e)}")
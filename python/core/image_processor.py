@@ -6,25 +6,68 @@ Handles image loading, background removal, adjustments, and conversion to ASCII
 from PIL import Image, ImageEnhance, ImageOps
 import numpy as np
 import os
+import threading
+
+from .ascii_renderer import (
+    apply_color_scheme,
+    brightness_to_char_indices,
+    quantize_colors,
+    render_ansi,
+    render_plain,
+    transparent_mask,
+)
+from .cancellation import CancelledError, raise_if_cancelled
+from .dithering import dither
+from .metrics import measure
+from .point_ops import apply_point_ops
+from .stage_cache import STAGE_ADJUST, STAGE_DECODE, STAGE_REMOVE_BACKGROUND
+from .wire_format import AsciiGrid, grid_to_text, pack_grid
 
 # Lazy import for rembg (only when background removal is needed)
 _rembg_remove = None
 _rembg_session = None
+# Prewarm may build the session on a background thread while a request needs it
+_rembg_lock = threading.Lock()
 
 def _get_rembg():
     global _rembg_remove, _rembg_session
-    if _rembg_remove is None:
-        try:
-            from rembg import remove, new_session
-            # Use u2netp model: 4.7MB vs 176MB for u2net
-            # 95% accuracy is perfect for ASCII art preprocessing
-            _rembg_session = new_session("u2netp")
-            _rembg_remove = remove
-        except ImportError:
-            raise ImportError("rembg is not installed. Background removal is not available.")
+    with _rembg_lock:
+        if _rembg_remove is None:
+            try:
+                from rembg import remove, new_session
+                # Use u2netp model: 4.7MB vs 176MB for u2net
+                # 95% accuracy is perfect for ASCII art preprocessing
+                _rembg_session = new_session("u2netp")
+                _rembg_remove = remove
+            except ImportError:
+                raise ImportError("rembg is not installed. Background removal is not available.")
     return _rembg_remove, _rembg_session
 
 
+def prewarm_rembg():
+    """Import rembg and build its session ahead of the first request, returns whether it is available"""
+    try:
+        _get_rembg()
+        return True
+    except ImportError:
+        return False
+
+
+# Resize-first mode: decode/reduce to at least this multiple of the target width,
+# rounded up to a power of two, then finish with LANCZOS
+DRAFT_OVERSAMPLE = 2
+RESIZE_REDUCING_GAP = 3.0
+
+# Modes Image.reduce supports (palette images are converted to RGBA first)
+REDUCIBLE_MODES = ('L', 'LA', 'RGB', 'RGBA')
+
+# Background removal needs more pixels than the final ASCII grid to find edges
+REMBG_MIN_WIDTH = 1024
+
+# Progressive mode: width of the quick monochrome preview sent before the full result
+PREVIEW_WIDTH = 60
+
+
 class ImageProcessor:
     # Character sets for different detail levels (from dark to light)
     CHARSETS = {
@@ -33,36 +76,54 @@ class ImageProcessor:
         'simple': '█▓▒░ '
     }
     
-    def __init__(self):
+    def __init__(self, stage_cache=None):
         self.image = None
         self.original_image = None
         self.alpha_mask = None
         self.dithered_brightness = None  # Store pure B/W dithered brightness map
+        self.stage_cache = stage_cache  # Optional StageCache for decoded / rembg intermediates
+        self.last_start_stage = None  # Pipeline stage the last process_and_convert started from
+        self.last_grid = None  # AsciiGrid behind the last convert_to_ascii / convert_to_halftone result
         
-    def load_image(self, path):
-        """Load image from file path"""
+    def load_image(self, path, draft_width=None):
+        """Load image from file path as RGB, compositing transparency onto white
+
+        With draft_width, JPEGs decode at reduced scale and other formats are
+        box-reduced by an integer factor before alpha compositing. The decoded
+        image is used directly (no copy) and the file is released once loaded.
+        """
         if not os.path.exists(path):
             raise FileNotFoundError(f"Image not found: {path}")
         
-        self.original_image = Image.open(path)
-        self.image = self.original_image.copy()
-        
-        # Handle transparency: convert RGBA to RGB with white background
-        if self.image.mode in ('RGBA', 'LA', 'P'):
-            # Create white background
-            background = Image.new('RGB', self.image.size, (255, 255, 255))
-            # If has alpha channel, use it for compositing
-            if self.image.mode == 'RGBA':
-                background.paste(self.image, mask=self.image.split()[3])
-            elif self.image.mode == 'LA':
-                background.paste(self.image.convert('RGB'), mask=self.image.split()[1])
-            else:  # Palette mode
-                self.image = self.image.convert('RGBA')
-                background.paste(self.image, mask=self.image.split()[3])
-            self.image = background
-        elif self.image.mode != 'RGB':
-            self.image = self.image.convert('RGB')
-            
+        image = Image.open(path)
+        if draft_width and image.format == 'JPEG':
+            # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding
+            orig_width, orig_height = image.size
+            if orig_width > draft_width:
+                draft_height = max(1, orig_height * draft_width // orig_width)
+                image.draft('RGB', (draft_width, draft_height))
+        image.load()  # Single-frame files close their file handle here
+        
+        if image.mode == 'P':
+            # Palette transparency becomes a real alpha channel
+            image = image.convert('RGBA')
+        if draft_width:
+            factor = image.width // draft_width
+            if factor >= 2 and image.mode in REDUCIBLE_MODES:
+                image = image.reduce(factor)
+        
+        # Handle transparency: composite onto a white background (after any reduction)
+        if image.mode in ('RGBA', 'LA'):
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            alpha = image.getchannel('A')
+            background.paste(image.convert('RGB') if image.mode == 'LA' else image, mask=alpha)
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        # Later stages always assign new images, so original and working image can share
+        self.original_image = self.image = image
+        self.alpha_mask = None
         return True
     
     def remove_background(self):
@@ -89,6 +150,17 @@ class ImageProcessor:
         self.image = background
         return True
     
+    def apply_alpha_mask(self, mask):
+        """Use a precomputed background-removal mask ('L', image size) instead of running rembg"""
+        if self.image is None:
+            raise ValueError("No image loaded")
+        
+        self.alpha_mask = mask
+        background = Image.new('RGB', self.image.size, (255, 255, 255))
+        background.paste(self.image, mask=mask)
+        self.image = background
+        return True
+    
     def adjust_brightness(self, value):
         """Adjust brightness (-100 to 100)"""
         if self.image is None:
@@ -118,7 +190,7 @@ class ImageProcessor:
     
 
     
-    def resize_image(self, width, ratio=None, keep_original=False):
+    def resize_image(self, width, ratio=None, keep_original=False, reducing_gap=None):
         """Resize image to target width while maintaining aspect ratio"""
         if self.image is None:
             raise ValueError("No image loaded")
@@ -143,10 +215,18 @@ class ImageProcessor:
             aspect_ratio = orig_width / orig_height
             height = int(width / aspect_ratio * 0.55)
         
-        self.image = self.image.resize((width, height), Image.Resampling.LANCZOS)
+        self.image = self.image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=reducing_gap)
     
-    def convert_to_ascii(self, charset='detailed', colored=True, color_scheme='original', use_dithering=False):
-        """Convert image to ASCII art using character gradients"""
+    def convert_to_ascii(self, charset='detailed', colored=True, color_scheme='original', use_dithering=False,
+                         merge_spans=False, color_levels=None, compact=False, ansi=None):
+        """Convert image to ASCII art using character gradients
+
+        merge_spans: emit one <span> per run of same-colored cells instead of per cell
+        color_levels: quantize each color channel to this many levels (longer runs)
+        compact: return a packed wire_format grid instead of text/HTML
+        ansi: 'truecolor' or '256' to return terminal text with ANSI color escapes
+              (ignored with compact, whose consumers expect a packed grid)
+        """
         if self.image is None:
             raise ValueError("No image loaded")
         
@@ -170,67 +250,27 @@ class ImageProcessor:
         # Map pixel brightness (0-255) directly to character index
         # Dark pixels (0) -> dark chars (@), Bright pixels (255) -> light chars (space)
         char_count = len(chars) - 1
-        char_indices = ((gray_pixels / 255) * char_count).astype(int)
+        char_indices = brightness_to_char_indices(gray_pixels, char_count)
         
+        # Transparent pixels (alpha mask from background removal) render as spaces
+        transparent = transparent_mask(alpha_array)
+        
+        colors = None
         if colored:
-            # Generate colored HTML with optimized string building
-            html_lines = []
-            for row_idx, row in enumerate(char_indices):
-                line_spans = []
-                for col_idx, char_idx in enumerate(row):
-                    # If alpha mask exists and this pixel is transparent, use space
-                    if alpha_array is not None and alpha_array[row_idx, col_idx] < 10:
-                        line_spans.append(' ')
-                    else:
-                        char = chars[char_idx]
-                        r, g, b = color_pixels[row_idx, col_idx]
-                        
-                        # Apply color scheme
-                        if color_scheme == 'grayscale':
-                            gray = int(0.299 * r + 0.587 * g + 0.114 * b)
-                            r, g, b = gray, gray, gray
-                        elif color_scheme == 'sepia':
-                            tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-                            tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-                            tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-                            r, g, b = min(255, tr), min(255, tg), min(255, tb)
-                        elif color_scheme == 'blue':
-                            gray = int(0.299 * r + 0.587 * g + 0.114 * b)
-                            r, g, b = gray // 3, gray // 2, gray
-                        elif color_scheme == 'green':
-                            gray = int(0.299 * r + 0.587 * g + 0.114 * b)
-                            r, g, b = gray // 3, gray, gray // 2
-                        elif color_scheme == 'red':
-                            gray = int(0.299 * r + 0.587 * g + 0.114 * b)
-                            r, g, b = gray, gray // 3, gray // 3
-                        elif color_scheme == 'purple':
-                            gray = int(0.299 * r + 0.587 * g + 0.114 * b)
-                            r, g, b = gray, gray // 3, gray
-                        elif color_scheme == 'cyan':
-                            gray = int(0.299 * r + 0.587 * g + 0.114 * b)
-                            r, g, b = gray // 3, gray, gray
-                        
-                        # Faster string concatenation without f-string overhead
-                        line_spans.append(f'<span style="color:rgb({r},{g},{b})">{char}</span>')
-                html_lines.append(''.join(line_spans))
-            
-            return '\n'.join(html_lines)
-        else:
-            # Generate monochrome ASCII
-            ascii_art = []
-            for row_idx, row in enumerate(char_indices):
-                ascii_row = ''
-                for col_idx, char_idx in enumerate(row):
-                    # If alpha mask exists and this pixel is transparent, use space
-                    if alpha_array is not None and alpha_array[row_idx, col_idx] < 10:
-                        ascii_row += ' '
-                    else:
-                        ascii_row += chars[char_idx]
-                ascii_art.append(ascii_row)
-            
-            return '\n'.join(ascii_art)
+            # Apply color scheme to the whole frame, then emit rows from string tables
+            colors = apply_color_scheme(color_pixels, color_scheme)
+            if color_levels:
+                colors = quantize_colors(colors, color_levels)
+        
+        grid = self.last_grid = AsciiGrid(chars, char_indices, colors, transparent, merge_spans)
+        if ansi and not compact:
+            if colors is None:
+                return render_plain(char_indices, chars, transparent)
+            return render_ansi(char_indices, colors, chars, transparent, ansi)
+        
+        return pack_grid(grid) if compact else grid_to_text(grid)
     
-    def convert_to_halftone(self):
+    def convert_to_halftone(self, method='floyd-steinberg', cancel_token=None, compact=False):
         """Convert image to pure black & white halftone (dithering only)"""
         if self.image is None:
             raise ValueError("No image loaded")
@@ -245,43 +285,56 @@ class ImageProcessor:
             alpha_resized = self.alpha_mask.resize(gray_image.size, Image.Resampling.LANCZOS)
             alpha_array = np.array(alpha_resized)
         
-        # Apply Floyd-Steinberg dithering - pure black/white only
-        height, width = gray_pixels.shape
-        dithered = gray_pixels.astype(np.float32).copy()
-        
-        for y in range(height):
-            for x in range(width):
-                old_pixel = dithered[y, x]
-                new_pixel = 255 if old_pixel > 128 else 0
-                dithered[y, x] = new_pixel
-                error = old_pixel - new_pixel
-                
-                if x + 1 < width:
-                    dithered[y, x + 1] += error * 7 / 16
-                if y + 1 < height:
-                    if x > 0:
-                        dithered[y + 1, x - 1] += error * 3 / 16
-                    dithered[y + 1, x] += error * 5 / 16
-                    if x + 1 < width:
-                        dithered[y + 1, x + 1] += error * 1 / 16
+        # Dither to pure black/white (Floyd-Steinberg by default)
+        black = dither(gray_pixels, method, cancel_token)
         
         # Generate pure BLACK and WHITE output
         # Black pixels = █ (solid block)
         # White pixels = space
-        halftone_lines = []
-        for row_idx, row in enumerate(dithered):
-            line = ''
-            for col_idx, pixel_value in enumerate(row):
-                # Check transparency
-                if alpha_array is not None and alpha_array[row_idx, col_idx] < 10:
-                    line += ' '
-                elif pixel_value < 128:  # Black
-                    line += '█'
-                else:  # White
-                    line += ' '
-            halftone_lines.append(line)
-        
-        return '\n'.join(halftone_lines)
+        transparent = transparent_mask(alpha_array)
+        grid = self.last_grid = AsciiGrid('█ ', np.where(black, 0, 1), None, transparent, False)
+        return pack_grid(grid) if compact else grid_to_text(grid)
+    
+    def load_stages(self, path, remove_background=False, draft_width=None, metrics=None):
+        """Load image and optionally remove background, reusing cached intermediates
+
+        Returns the pipeline stage work actually started from.
+        """
+        cache = self.stage_cache
+        if cache is None:
+            with measure(metrics, STAGE_DECODE):
+                self.load_image(path, draft_width)
+            if remove_background:
+                with measure(metrics, STAGE_REMOVE_BACKGROUND):
+                    self.remove_background()
+            return STAGE_DECODE
+        
+        # Cached images are never modified in place: every step below
+        # assigns a new image to self.image
+        if remove_background:
+            cached = cache.get(path, STAGE_REMOVE_BACKGROUND, draft_width)
+            if cached is not None:
+                self.image, self.alpha_mask = cached
+                self.original_image = self.image
+                return STAGE_ADJUST
+        
+        decoded = cache.get(path, STAGE_DECODE, draft_width)
+        if decoded is not None:
+            self.image = self.original_image = decoded
+            self.alpha_mask = None
+            start_stage = STAGE_REMOVE_BACKGROUND if remove_background else STAGE_ADJUST
+        else:
+            with measure(metrics, STAGE_DECODE):
+                self.load_image(path, draft_width)
+            cache.put(path, STAGE_DECODE, self.image, draft_width)
+            start_stage = STAGE_DECODE
+        
+        if remove_background:
+            with measure(metrics, STAGE_REMOVE_BACKGROUND):
+                self.remove_background()
+            cache.put(path, STAGE_REMOVE_BACKGROUND, (self.image, self.alpha_mask), draft_width)
+        
+        return start_stage
     
     def reset(self):
         """Reset to original image"""
@@ -292,54 +345,110 @@ class ImageProcessor:
             self.alpha_mask = None
             self.dithered_brightness = None
     
-    def process_and_convert(self, path, options):
-        """Complete pipeline: load, process, and convert to ASCII"""
+    def apply_adjustments(self, options):
+        """Apply brightness, contrast and invert from options as one fused LUT pass"""
+        if self.image is None:
+            raise ValueError("No image loaded")
+        
+        self.image = apply_point_ops(
+            self.image,
+            brightness=options.get('brightness', 0),
+            contrast=options.get('contrast', 100),
+            invert=options.get('invert', False)
+        )
+    
+    def draft_width_for(self, options):
+        """Reduced decode width used by resize-first mode, or None for a full decode"""
+        if not options.get('resizeFirst', False) or options.get('keepOriginal', False):
+            return None
+        width = options.get('width', 120)
+        target_width = width * 3 if options.get('dither', False) else width
+        # Power-of-two buckets: nearby widths share one cached decode, so a width
+        # tweak starts at adjust instead of decoding again
+        draft_width = 1 << (target_width * DRAFT_OVERSAMPLE - 1).bit_length()
+        if options.get('removeBackground', False):
+            draft_width = max(draft_width, REMBG_MIN_WIDTH)
+        return draft_width
+    
+    def quick_preview(self, path, options):
+        """Fast low-width monochrome rendering (no background removal or dithering)
+
+        JPEGs get their own small draft decode; other formats decode with the
+        same variant as the full pass, so with a stage cache it starts from there.
+        """
         try:
-            # Load image
-            self.load_image(path)
-            
-            # Remove background if requested
-            if options.get('removeBackground', False):
-                self.remove_background()
-            
-            # Apply adjustments
-            brightness = options.get('brightness', 0)
-            if brightness != 0:
-                self.adjust_brightness(brightness)
+            with Image.open(path) as probe:
+                is_jpeg = probe.format == 'JPEG'
+            draft_width = PREVIEW_WIDTH * DRAFT_OVERSAMPLE if is_jpeg else self.draft_width_for(options)
+            self.load_stages(path, False, draft_width)
+            width = min(options.get('width', 120), PREVIEW_WIDTH)
+            self.resize_image(width, options.get('ratio'), reducing_gap=RESIZE_REDUCING_GAP)
+            self.apply_adjustments(options)
+            return self.convert_to_ascii(options.get('charset', 'detailed'), colored=False)
+        except Exception as e:
+            raise Exception(f"Processing error: {str(e)}")
+    
+    def process_and_convert(self, path, options, cancel_token=None, metrics=None):
+        """Complete pipeline: load, process, and convert to ASCII
+
+        cancel_token (optional CancelToken) is checked between stages; metrics
+        (optional ConversionMetrics) records each stage's time.
+        """
+        try:
+            # Choose output mode: halftone dithering OR ASCII art
+            use_dithering = options.get('dither', False)
+            remove_background = options.get('removeBackground', False)
             
-            contrast = options.get('contrast', 100)
-            if contrast != 100:
-                self.adjust_contrast(contrast)
+            # For dithering: use higher resolution (3x width) for better quality
+            width = options.get('width', 120)
+            target_width = width * 3 if use_dithering else width
+            ratio = options.get('ratio')
+            keep_original = options.get('keepOriginal', False)
             
-            if options.get('invert', False):
-                self.invert_colors()
+            # Resize-first: shrink (and draft-decode JPEGs) before the point operations
+            resize_first = options.get('resizeFirst', False) and not keep_original
+            draft_width = self.draft_width_for(options)
             
-            # Choose output mode: halftone dithering OR ASCII art
-            use_dithering = options.get('dither', False)
+            # Load image and remove background if requested (cached when possible)
+            self.last_start_stage = self.load_stages(path, remove_background, draft_width, metrics)
+            if self.stage_cache is not None:
+                self.stage_cache.record_start(self.last_start_stage)
+            raise_if_cancelled(cancel_token)
             
-            if use_dithering:
-                # For dithering: use higher resolution (3x width) for better quality
-                width = options.get('width', 120)
-                dither_width = width * 3  # Triple the resolution for better dithering
-                ratio = options.get('ratio')
-                keep_original = options.get('keepOriginal', False)
-                self.resize_image(dither_width, ratio, keep_original)
-                
-                # Generate pure black & white halftone (dithering)
-                result = self.convert_to_halftone()
+            if resize_first:
+                with measure(metrics, 'resize'):
+                    self.resize_image(target_width, ratio, keep_original, reducing_gap=RESIZE_REDUCING_GAP)
+                with measure(metrics, STAGE_ADJUST):
+                    self.apply_adjustments(options)
             else:
-                # For ASCII: use normal width
-                width = options.get('width', 120)
-                ratio = options.get('ratio')
-                keep_original = options.get('keepOriginal', False)
-                self.resize_image(width, ratio, keep_original)
-                
-                # Generate colored ASCII art (character gradients)
-                charset = options.get('charset', 'detailed')
-                color_scheme = options.get('colorScheme', 'original')
-                result = self.convert_to_ascii(charset, colored=True, color_scheme=color_scheme, use_dithering=False)
+                with measure(metrics, STAGE_ADJUST):
+                    self.apply_adjustments(options)
+                with measure(metrics, 'resize'):
+                    self.resize_image(target_width, ratio, keep_original)
+            raise_if_cancelled(cancel_token)
+            
+            with measure(metrics, 'render'):
+                if use_dithering:
+                    # Generate pure black & white halftone (dithering)
+                    result = self.convert_to_halftone(
+                        options.get('ditherMethod', 'floyd-steinberg'), cancel_token,
+                        compact=options.get('compact', False)
+                    )
+                else:
+                    # Generate colored ASCII art (character gradients)
+                    charset = options.get('charset', 'detailed')
+                    color_scheme = options.get('colorScheme', 'original')
+                    result = self.convert_to_ascii(
+                        charset, colored=options.get('colored', True), color_scheme=color_scheme, use_dithering=False,
+                        merge_spans=options.get('mergeSpans', False),
+                        color_levels=options.get('colorLevels'),
+                        compact=options.get('compact', False),
+                        ansi=options.get('ansi')
+                    )
             
             return result
             
+        except CancelledError:
+            raise
         except Exception as e:
             raise Exception(f"Processing error: {str(e)}")
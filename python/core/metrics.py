@@ -0,0 +1,186 @@
+"""
+Metrics Module
+Per-stage wall time and peak memory (RSS and Python heap) of a conversion, and rolling percentiles since startup
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+# Samples kept per stage for the rolling percentiles
+STATS_WINDOW = 1000
+# Seconds between resident-memory samples while a stage runs
+RSS_SAMPLE_INTERVAL = 0.005
+
+_PAGE_KB = os.sysconf('SC_PAGE_SIZE') / 1024 if hasattr(os, 'sysconf') else 4
+
+
+def measure(metrics, name):
+    """metrics.stage(name), or a no-op context when metrics is None"""
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+def current_rss_kb():
+    """Resident memory of this process in KB, or None without /proc (non-Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_KB
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RssSampler:
+    """Background thread tracking the resident-memory high-water mark of each open stage
+
+    Sampling catches peaks that are freed again before the stage ends (Pillow
+    buffers, numpy temporaries) without any cooperation from the stage itself.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._peaks = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def begin(self):
+        """Open a stage; returns (token, rss_kb), or None when RSS is unavailable"""
+        rss = current_rss_kb()
+        if rss is None:
+            return None
+        token = object()
+        with self._lock:
+            self._peaks[token] = rss
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+                self._thread.start()
+        return token, rss
+
+    def end(self, token):
+        """Close a stage; returns its peak RSS in KB"""
+        rss = current_rss_kb() or 0
+        with self._lock:
+            return max(self._peaks.pop(token), rss)
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            rss = current_rss_kb()
+            if rss is None:
+                continue
+            with self._lock:
+                for token, peak in self._peaks.items():
+                    if rss > peak:
+                        self._peaks[token] = rss
+
+
+class ConversionMetrics:
+    """Stage timings for one request
+
+    With trace_memory, each stage also records how far process RSS rose above
+    its starting point (peakRssKb, sampled, Linux only) and the peak Python/numpy
+    heap it allocated (pyHeapPeakKb, tracemalloc; misses Pillow's image buffers).
+    Stages run more than once (e.g. per GIF frame) are summed, memory is the max.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._started_tracing = False
+        self._rss = RssSampler() if trace_memory else None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            rss_start = self._rss.begin()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            entry = self.stages.setdefault(name, {'ms': 0.0, 'calls': 0})
+            entry['ms'] += elapsed
+            entry['calls'] += 1
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                entry['pyHeapPeakKb'] = max(entry.get('pyHeapPeakKb', 0.0), (peak - base) / 1024)
+                if rss_start is not None:
+                    token, rss_base = rss_start
+                    rss_peak = self._rss.end(token) - rss_base
+                    entry['peakRssKb'] = max(entry.get('peakRssKb', 0.0), float(rss_peak))
+
+    def add(self, name, ms, calls=1):
+        """Record time measured elsewhere (e.g. in a worker process)"""
+        entry = self.stages.setdefault(name, {'ms': 0.0, 'calls': 0})
+        entry['ms'] += ms
+        entry['calls'] += calls
+
+    def finish(self):
+        """Stop memory tracing started by this instance, returns as_dict()"""
+        if self._rss is not None:
+            self._rss.stop()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return self.as_dict()
+
+    def as_dict(self):
+        return {
+            'totalMs': (time.perf_counter() - self._start) * 1000,
+            'stages': {
+                name: {key: round(value, 3) if isinstance(value, float) else value for key, value in entry.items()}
+                for name, entry in self.stages.items()
+            },
+        }
+
+
+class StageStats:
+    """Rolling per-stage wall times across requests, for the stats command"""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.window = window
+        self.requests = 0
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, metrics):
+        """Add every stage of a ConversionMetrics (plus its total) as one sample"""
+        summary = metrics.as_dict()
+        with self._lock:
+            self.requests += 1
+            self._add('total', summary['totalMs'])
+            for name, entry in summary['stages'].items():
+                self._add(name, entry['ms'])
+
+    def _add(self, name, ms):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(ms)
+
+    def stats(self):
+        with self._lock:
+            stages = {
+                name: {
+                    'count': len(samples),
+                    'p50Ms': float(np.percentile(samples, 50)),
+                    'p95Ms': float(np.percentile(samples, 95)),
+                }
+                for name, samples in self._samples.items()
+            }
+            return {'requests': self.requests, 'window': self.window, 'stages': stages}
@@ -0,0 +1,69 @@
+"""
+Point Operations Module
+Brightness, contrast and invert fused into one lookup table pass
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+def _blend_lut(pivot, factor, values):
+    """Pillow's Image.blend(solid pivot, image, factor) as a function of pixel value
+
+    Blend works in float32 and truncates, so do the same to match it exactly.
+    """
+    alpha = np.float32(factor)
+    blended = np.float32(pivot) + alpha * (values - np.float32(pivot))
+    return np.clip(blended, 0, 255).astype(np.int64)
+
+
+@lru_cache(maxsize=256)
+def build_point_lut(brightness=0, contrast=100, invert=False, pivot=0):
+    """256-entry LUT for brightness (-100..100), contrast (0..200) and invert
+
+    pivot is the mean luminance (0-255) of the brightness-adjusted image that
+    contrast scales around; it only matters when contrast != 100.
+    """
+    values = np.arange(256, dtype=np.float32)
+    lut = values.astype(np.int64)
+
+    if brightness != 0:
+        # ImageEnhance.Brightness: blend with black
+        lut = _blend_lut(0, 1.0 + brightness / 100.0, lut.astype(np.float32))
+
+    if contrast != 100:
+        # ImageEnhance.Contrast: blend with a solid gray at the mean luminance
+        lut = _blend_lut(pivot, contrast / 100.0, lut.astype(np.float32))
+
+    if invert:
+        lut = 255 - lut
+
+    return tuple(lut.tolist())
+
+
+def contrast_pivot(image, brightness=0):
+    """Mean luminance of the image after brightness, computed like ImageEnhance.Contrast
+
+    Pillow averages the integer pixels of convert('L'), which mix all three
+    channels of each pixel, so the mean is taken from the L histogram of the
+    brightness-adjusted image rather than from per-channel histograms.
+    """
+    if brightness != 0:
+        image = image.point(list(build_point_lut(brightness)) * len(image.getbands()))
+    if image.mode != 'L':
+        image = image.convert('L')
+    histogram = image.histogram()
+    pixels = sum(histogram)
+    if pixels == 0:
+        return 0
+    return int(sum(value * count for value, count in enumerate(histogram)) / pixels + 0.5)
+
+
+def apply_point_ops(image, brightness=0, contrast=100, invert=False):
+    """Apply brightness, contrast and invert to an RGB/L image in one Image.point pass"""
+    if brightness == 0 and contrast == 100 and not invert:
+        return image
+
+    pivot = contrast_pivot(image, brightness) if contrast != 100 else 0
+    lut = build_point_lut(brightness, contrast, bool(invert), pivot)
+    return image.point(list(lut) * len(image.getbands()))
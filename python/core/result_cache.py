@@ -0,0 +1,201 @@
+"""
+Result Cache Module
+LRU cache of finished conversions keyed by source file identity and options
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+# Bump when rendering output changes so persisted entries are invalidated
+CACHE_VERSION = 2
+
+# Defaults used to normalize options, so {} and {'width': 120} share an entry
+DEFAULT_OPTIONS = {
+    'width': 120,
+    'charset': 'detailed',
+    'colorScheme': 'original',
+    'removeBackground': False,
+    'brightness': 0,
+    'contrast': 100,
+    'invert': False,
+    'dither': False,
+    'ditherMethod': 'floyd-steinberg',
+    'ratio': None,
+    'keepOriginal': False,
+    'mergeSpans': False,
+    'colorLevels': None,
+    'compact': False,
+    'colored': True,
+}
+
+# Options that change how a result is computed but not the result itself
+EXECUTION_OPTIONS = ('parallel', 'workers')
+
+
+def normalize_options(options):
+    """Options with defaults filled in and execution-only keys dropped"""
+    normalized = dict(DEFAULT_OPTIONS)
+    normalized.update({k: v for k, v in options.items() if k not in EXECUTION_OPTIONS})
+    return normalized
+
+
+def file_fingerprint(path, hash_contents=False):
+    """Identity of a source file: content hash, or path + mtime + size
+
+    A directory (image sequence) is identified by the fingerprints of its files.
+    """
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(path)):
+            child = os.path.join(path, name)
+            if os.path.isfile(child):
+                digest.update(file_fingerprint(child, hash_contents).encode())
+        return f'{os.path.abspath(path)}:{digest.hexdigest()}'
+
+    if hash_contents:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    stat = os.stat(path)
+    return f'{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}'
+
+
+def result_size(value):
+    """Approximate in-memory size of a cached result (characters of ASCII)"""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        text = [value.get('ascii', ''), value.get('thumbnail', '')] + value.get('frames', [])
+        return sum(len(part) for part in text)
+    return 0
+
+
+class ResultCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, persist_dir=None, hash_contents=False):
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self.hash_contents = hash_contents
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+
+        if self.persist_dir and not os.path.exists(self.persist_dir):
+            os.makedirs(self.persist_dir)
+
+    def make_key(self, path, options):
+        """Cache key for converting `path` with `options`"""
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'file': file_fingerprint(path, self.hash_contents),
+            'options': normalize_options(options),
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached result for key, or None"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        value = self._load_from_disk(key)
+        if value is not None:
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, value)
+            return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store a result, evicting least recently used entries over budget"""
+        self._store(key, value)
+        self._save_to_disk(key, value)
+
+    def clear(self):
+        """Drop all in-memory entries (persisted entries are kept)"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'diskHits': self.disk_hits,
+            'evictions': self.evictions,
+            'hitRate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'maxBytes': self.max_bytes,
+            'persistent': bool(self.persist_dir),
+        }
+
+    def _store(self, key, value):
+        """Insert into the in-memory LRU"""
+        size = result_size(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        """File holding a persisted entry"""
+        return os.path.join(self.persist_dir, f'{key}.json')
+
+    def _load_from_disk(self, key):
+        """Persisted result for key, or None"""
+        if not self.persist_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)  # Mark as recently used for disk pruning
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _save_to_disk(self, key, value):
+        """Persist a result when a persist_dir is configured"""
+        if not self.persist_dir:
+            return
+        with open(self._disk_path(key), 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        self._prune_disk()
+
+    def _prune_disk(self):
+        """Keep persisted entries within max_bytes, oldest first out"""
+        files = []
+        for name in os.listdir(self.persist_dir):
+            if name.endswith('.json'):
+                path = os.path.join(self.persist_dir, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
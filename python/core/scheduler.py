@@ -0,0 +1,145 @@
+"""
+Scheduler Module
+Runs conversion jobs on a background worker so the command loop stays responsive
+"""
+
+import threading
+from collections import deque
+
+from .cancellation import CancelledError, CancelToken
+
+# Job kinds: a superseding submit only cancels convert jobs; batches stop only on cancel_all
+JOB_CONVERT = 'convert'
+JOB_BATCH = 'batch'
+SUPERSEDABLE_KINDS = (JOB_CONVERT,)
+
+
+class ConversionScheduler:
+    """One worker thread; jobs run in order and a newer job can supersede older ones
+
+    Processors keep per-image state, so conversions run one at a time. A job is a
+    callable taking a CancelToken; cancelled jobs are reported through
+    on_cancelled(request_id, reason) and unexpected exceptions through on_error.
+    Queued jobs sharing a coalesce key are collapsed so only the latest one runs.
+    Superseding only affects jobs of a SUPERSEDABLE_KINDS kind.
+    """
+
+    def __init__(self, on_cancelled=None, on_error=None):
+        self.on_cancelled = on_cancelled
+        self.on_error = on_error
+        self.cancelled_count = 0  # stopped (or otherwise cancelled) requests
+        self.superseded_count = 0  # converts replaced by a newer convert
+        self.coalesced_count = 0
+        self.completed_count = 0
+        self._pending = deque()  # (request_id, job, token, coalesce_key, kind)
+        self._current = None  # (request_id, token, kind) of the running job
+        self._closed = False
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name='conversion-worker', daemon=True)
+        self._worker.start()
+
+    def submit(self, request_id, job, supersede=True, coalesce_key=None, kind=JOB_CONVERT):
+        """Queue a job; with supersede, cancel the running convert job and drop pending ones
+
+        Jobs of other kinds (batches) are left running and queued. Without
+        supersede, a pending job with the same coalesce_key is replaced by this
+        one (keeping its place in the queue) instead of running both.
+        """
+        entry = (request_id, job, CancelToken(), coalesce_key, kind)
+        coalesced = []
+        with self._condition:
+            dropped = self._cancel_locked('superseded', SUPERSEDABLE_KINDS) if supersede else []
+            if coalesce_key is not None:
+                for position, pending in enumerate(self._pending):
+                    if pending[3] == coalesce_key:
+                        coalesced.append(pending[0])
+                        self._pending[position] = entry
+                        break
+            if not coalesced:
+                self._pending.append(entry)
+            self._condition.notify()
+        self._report_cancelled(dropped, 'superseded')
+        self._report_cancelled(coalesced, 'coalesced')
+
+    def cancel_all(self):
+        """Cancel the running job and drop pending ones, returns how many were cancelled"""
+        with self._condition:
+            dropped = self._cancel_locked('stopped')
+            running = self._current is not None
+        self._report_cancelled(dropped, 'stopped')
+        return len(dropped) + int(running)
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs, optionally waiting for queued ones to finish"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if wait:
+            self._worker.join()
+
+    def stats(self):
+        """Queue depth and counters of cancelled, superseded, coalesced and completed jobs"""
+        with self._condition:
+            return {
+                'pending': len(self._pending),
+                'running': self._current is not None,
+                'cancelled': self.cancelled_count,
+                'superseded': self.superseded_count,
+                'coalesced': self.coalesced_count,
+                'completed': self.completed_count,
+            }
+
+    @property
+    def busy(self):
+        """Whether a job is running or queued"""
+        with self._condition:
+            return self._current is not None or bool(self._pending)
+
+    def _cancel_locked(self, reason, kinds=None):
+        """Cancel the current job and pop pending ones, only those of `kinds` when given
+
+        The caller holds the lock.
+        """
+        if self._current is not None and (kinds is None or self._current[2] in kinds):
+            self._current[1].cancel(reason)
+        dropped = [pending[0] for pending in self._pending if kinds is None or pending[4] in kinds]
+        kept = [pending for pending in self._pending if kinds is not None and pending[4] not in kinds]
+        self._pending.clear()
+        self._pending.extend(kept)
+        return dropped
+
+    def _report_cancelled(self, request_ids, reason):
+        """Count (per reason) and report cancelled requests"""
+        for request_id in request_ids:
+            if reason == 'coalesced':
+                self.coalesced_count += 1
+            elif reason == 'superseded':
+                self.superseded_count += 1
+            else:
+                self.cancelled_count += 1
+            if self.on_cancelled:
+                self.on_cancelled(request_id, reason)
+
+    def _run(self):
+        """Worker loop: run queued jobs until shut down"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                request_id, job, token, _, kind = self._pending.popleft()
+                self._current = (request_id, token, kind)
+
+            try:
+                job(token)
+                self.completed_count += 1
+            except CancelledError:
+                self._report_cancelled([request_id], token.reason)
+            except Exception as e:
+                # Keep the worker alive; the job is expected to report its own errors
+                if self.on_error:
+                    self.on_error(request_id, e)
+            finally:
+                with self._condition:
+                    self._current = None
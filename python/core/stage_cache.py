@@ -0,0 +1,92 @@
+"""
+Stage Cache Module
+Keeps expensive pipeline intermediates (decoded image, background removal) per source file
+"""
+
+from collections import OrderedDict
+
+from .result_cache import file_fingerprint
+
+# Pipeline stages in order; a request starts from the first one not served by the cache
+STAGE_DECODE = 'decode'
+STAGE_REMOVE_BACKGROUND = 'remove_background'
+STAGE_ADJUST = 'adjust'
+
+# Intermediates that can be cached, named after the stage that produces them
+CACHEABLE_STAGES = (STAGE_DECODE, STAGE_REMOVE_BACKGROUND)
+
+
+def intermediate_size(value):
+    """Approximate bytes held by a cached image or (image, alpha_mask) pair"""
+    if isinstance(value, tuple):
+        return sum(intermediate_size(item) for item in value if item is not None)
+    width, height = value.size
+    return width * height * len(value.getbands())
+
+
+class StageCache:
+    def __init__(self, max_files=4, max_bytes=512 * 1024 * 1024):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self.hits = {stage: 0 for stage in CACHEABLE_STAGES}
+        self.misses = {stage: 0 for stage in CACHEABLE_STAGES}
+        self.start_stages = {stage: 0 for stage in (STAGE_DECODE, STAGE_REMOVE_BACKGROUND, STAGE_ADJUST)}
+        self._files = OrderedDict()  # fingerprint -> {(stage, variant): (value, size)}
+
+    def get(self, path, stage, variant=None):
+        """Cached output of `stage` for this file, or None
+
+        variant distinguishes outputs of the same stage, e.g. a reduced-scale decode.
+        """
+        key = file_fingerprint(path)
+        entry = self._files.get(key)
+        if entry is not None and (stage, variant) in entry:
+            self._files.move_to_end(key)
+            self.hits[stage] += 1
+            return entry[(stage, variant)][0]
+
+        self.misses[stage] += 1
+        return None
+
+    def put(self, path, stage, value, variant=None):
+        """Store the output of `stage` for this file, evicting old files over budget"""
+        size = intermediate_size(value)
+        if size > self.max_bytes:
+            return
+
+        key = file_fingerprint(path)
+        entry = self._files.setdefault(key, {})
+        self._files.move_to_end(key)
+        if (stage, variant) in entry:
+            self.current_bytes -= entry[(stage, variant)][1]
+        entry[(stage, variant)] = (value, size)
+        self.current_bytes += size
+
+        # Evict whole files, least recently used first, but never the one just stored
+        while len(self._files) > 1 and (len(self._files) > self.max_files or self.current_bytes > self.max_bytes):
+            _, evicted = self._files.popitem(last=False)
+            self.current_bytes -= sum(size for _, size in evicted.values())
+            self.evictions += 1
+
+    def record_start(self, stage):
+        """Count which stage a request had to start from"""
+        self.start_stages[stage] += 1
+
+    def clear(self):
+        """Drop all cached intermediates"""
+        self._files.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        """Per-stage hit/miss counters, start stages and memory usage"""
+        return {
+            'hits': dict(self.hits),
+            'misses': dict(self.misses),
+            'startStages': dict(self.start_stages),
+            'evictions': self.evictions,
+            'files': len(self._files),
+            'bytes': self.current_bytes,
+            'maxBytes': self.max_bytes,
+        }
@@ -0,0 +1,109 @@
+"""
+Terminal Player Module
+Plays converted frames in a terminal with ANSI colors and cursor-home redraws
+
+Run from the python/ directory:
+    python -m core.terminal_player animation.gif --width 100
+    python -m core.terminal_player frames/ --fps 15
+    python -m core.terminal_player photo.jpg --colors 256
+"""
+
+import argparse
+import itertools
+import os
+import shutil
+import sys
+import time
+
+from .animation_source import effective_delay, is_animated
+from .ascii_renderer import ANSI_MODES, ANSI_RESET
+from .gif_processor import GifProcessor
+from .image_processor import ImageProcessor
+
+CURSOR_HOME = '\x1b[H'
+CLEAR_SCREEN = '\x1b[2J'
+HIDE_CURSOR = '\x1b[?25l'
+SHOW_CURSOR = '\x1b[?25h'
+
+def frame_delay(delay_ms):
+    """Seconds to show a frame with the given GIF delay (browser clamp applied)"""
+    return effective_delay(delay_ms) / 1000
+
+
+def play(frames, out=None, loops=1):
+    """Draw (frame, delay_ms) pairs in place, keeping the GIF timing
+
+    frames may be a lazy iterator (e.g. GifProcessor.iter_ascii_frames); it is
+    consumed once and replayed from memory when loops > 1. loops=0 repeats until
+    interrupted. Returns the number of frames drawn.
+    """
+    out = out or sys.stdout
+    played = []
+    drawn = 0
+    out.write(HIDE_CURSOR + CLEAR_SCREEN)
+    try:
+        deadline = time.perf_counter()
+        passes = itertools.count() if loops == 0 else range(loops)
+        for loop in passes:
+            source = frames if loop == 0 else played
+            for frame, delay in source:
+                if loop == 0 and loops != 1:
+                    played.append((frame, delay))
+                out.write(CURSOR_HOME + frame)
+                out.flush()
+                drawn += 1
+                # Sleep to an absolute deadline so conversion/write time doesn't add up
+                deadline = max(deadline + frame_delay(delay), time.perf_counter())
+                time.sleep(max(0.0, deadline - time.perf_counter()))
+            if loop == 0 and not played:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        out.write(ANSI_RESET + SHOW_CURSOR + '\n')
+        out.flush()
+    return drawn
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m core.terminal_player', description='Play ASCII art in a terminal')
+    parser.add_argument('path', help='GIF, animated WebP/PNG, image-sequence directory or image')
+    parser.add_argument('--width', type=int, default=None, help='columns (default: terminal width)')
+    parser.add_argument('--colors', choices=ANSI_MODES + ('none',), default='truecolor',
+                        help='ANSI color mode (default: truecolor)')
+    parser.add_argument('--charset', default='detailed')
+    parser.add_argument('--color-scheme', default='original')
+    parser.add_argument('--loops', type=int, default=0, help='times to play a GIF, 0 = until Ctrl+C (default: 0)')
+    parser.add_argument('--parallel', action='store_true', help='convert GIF frames on a process pool')
+    parser.add_argument('--fps', type=float, default=None, help='drop frames above this rate')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.path):
+        print(f"File not found: {args.path}", file=sys.stderr)
+        return 1
+
+    width = args.width or max(20, shutil.get_terminal_size().columns - 1)
+    options = {
+        'width': width,
+        'charset': args.charset,
+        'colorScheme': args.color_scheme,
+        'colored': args.colors != 'none',
+        'ansi': args.colors if args.colors != 'none' else 'truecolor',
+        'resizeFirst': True,
+        'parallel': args.parallel,
+        'targetFps': args.fps,
+    }
+
+    if is_animated(args.path):
+        # Frames are drawn as they are converted; later loops replay them from memory
+        play(GifProcessor().iter_ascii_frames(args.path, options), loops=args.loops)
+    else:
+        print(ImageProcessor().process_and_convert(args.path, options) + ANSI_RESET)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
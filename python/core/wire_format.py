@@ -0,0 +1,174 @@
+"""
+Wire Format Module
+Compact binary encoding of an ASCII grid (char indices + palette-indexed colors)
+"""
+
+import base64
+import math
+import struct
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from .ascii_renderer import quantize_colors, render_html, render_html_merged, render_plain
+
+# A rendered frame before it is turned into text: chars is the charset string,
+# char_indices an (H, W) int array, colors an (H, W, 3) array or None for
+# monochrome, transparent an (H, W) bool array or None
+AsciiGrid = namedtuple('AsciiGrid', 'chars char_indices colors transparent merge_spans')
+
+MAGIC = b'ASCG'
+VERSION = 1
+WIRE_COMPRESSION_LEVEL = 1
+
+# Header: magic, version, flags, palette index size, reserved, width, height
+HEADER = struct.Struct('<4sBBBBII')
+SECTION_LENGTH = struct.Struct('<I')
+
+FLAG_COLORED = 1
+FLAG_TRANSPARENT = 2
+FLAG_MERGE_SPANS = 4
+
+# Char index written for transparent cells
+TRANSPARENT_CELL = 255
+
+# Gallery thumbnails: at most this many columns / rows and characters of markup,
+# colors snapped to this many levels so neighbouring cells merge into one span
+THUMBNAIL_COLUMNS = 64
+THUMBNAIL_ROWS = 32
+THUMBNAIL_MAX_CHARS = 8192
+THUMBNAIL_COLOR_LEVELS = 4
+
+
+def _section(data):
+    """Length-prefixed section"""
+    return SECTION_LENGTH.pack(len(data)) + data
+
+
+def _read_section(data, offset):
+    """Read one length-prefixed section, returns (bytes, next offset)"""
+    (length,) = SECTION_LENGTH.unpack_from(data, offset)
+    offset += SECTION_LENGTH.size
+    return data[offset:offset + length], offset + length
+
+
+def _index_dtype(palette_size):
+    """Smallest unsigned dtype that can index the palette"""
+    if palette_size <= 1 << 8:
+        return np.dtype('<u1')
+    if palette_size <= 1 << 16:
+        return np.dtype('<u2')
+    return np.dtype('<u4')
+
+
+def encode_grid(grid):
+    """Encode an AsciiGrid as zlib-compressed bytes
+
+    Layout (little-endian, before compression): 16-byte header, then four
+    length-prefixed sections: UTF-8 charset, RGB palette, one u8 char index per
+    cell (255 = transparent), one palette index per cell (u8/u16/u32).
+    """
+    height, width = grid.char_indices.shape
+    cells = grid.char_indices.astype(np.uint8)
+    flags = FLAG_MERGE_SPANS if grid.merge_spans else 0
+
+    if grid.transparent is not None:
+        flags |= FLAG_TRANSPARENT
+        cells = np.where(grid.transparent, TRANSPARENT_CELL, cells).astype(np.uint8)
+
+    palette = b''
+    color_indices = b''
+    index_size = 0
+    if grid.colors is not None:
+        flags |= FLAG_COLORED
+        colors = grid.colors.astype(np.int64)
+        keys = ((colors[..., 0] << 16) | (colors[..., 1] << 8) | colors[..., 2]).ravel()
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        dtype = _index_dtype(len(unique_keys))
+        index_size = dtype.itemsize
+        rgb = np.stack([(unique_keys >> 16) & 255, (unique_keys >> 8) & 255, unique_keys & 255], axis=-1)
+        palette = rgb.astype(np.uint8).tobytes()
+        color_indices = inverse.astype(dtype).tobytes()
+
+    raw = b''.join((
+        HEADER.pack(MAGIC, VERSION, flags, index_size, 0, width, height),
+        _section(grid.chars.encode('utf-8')),
+        _section(palette),
+        _section(cells.tobytes()),
+        _section(color_indices),
+    ))
+    return zlib.compress(raw, WIRE_COMPRESSION_LEVEL)
+
+
+def decode_grid(data):
+    """Decode bytes from encode_grid back into an AsciiGrid"""
+    raw = zlib.decompress(data)
+    magic, version, flags, index_size, _, width, height = HEADER.unpack_from(raw, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a compact ASCII grid payload")
+
+    offset = HEADER.size
+    chars, offset = _read_section(raw, offset)
+    palette, offset = _read_section(raw, offset)
+    cells, offset = _read_section(raw, offset)
+    color_indices, offset = _read_section(raw, offset)
+
+    char_indices = np.frombuffer(cells, dtype=np.uint8).reshape(height, width).astype(np.int64)
+    transparent = None
+    if flags & FLAG_TRANSPARENT:
+        transparent = char_indices == TRANSPARENT_CELL
+        char_indices = np.where(transparent, 0, char_indices)
+
+    colors = None
+    if flags & FLAG_COLORED:
+        rgb = np.frombuffer(palette, dtype=np.uint8).reshape(-1, 3).astype(np.int64)
+        indices = np.frombuffer(color_indices, dtype=np.dtype(f'<u{index_size}'))
+        colors = rgb[indices].reshape(height, width, 3)
+
+    return AsciiGrid(chars.decode('utf-8'), char_indices, colors, transparent, bool(flags & FLAG_MERGE_SPANS))
+
+
+def pack_grid(grid):
+    """Encode a grid as a base64 string that fits in a JSON message"""
+    return base64.b64encode(encode_grid(grid)).decode('ascii')
+
+
+def unpack_grid(payload):
+    """Inverse of pack_grid"""
+    return decode_grid(base64.b64decode(payload))
+
+
+def grid_to_text(grid):
+    """Render a grid exactly as the regular (non-compact) pipeline would"""
+    if grid.colors is None:
+        return render_plain(grid.char_indices, grid.chars, grid.transparent)
+    if grid.merge_spans:
+        return render_html_merged(grid.char_indices, grid.colors, grid.chars, grid.transparent)
+    return render_html(grid.char_indices, grid.colors, grid.chars, grid.transparent)
+
+
+def _thumbnail_text(grid, step):
+    """Every step-th row and column of a grid, rendered with merged, quantized spans"""
+    char_indices = grid.char_indices[::step, ::step]
+    transparent = None if grid.transparent is None else grid.transparent[::step, ::step]
+    if grid.colors is None:
+        return render_plain(char_indices, grid.chars, transparent)
+    colors = quantize_colors(grid.colors[::step, ::step], THUMBNAIL_COLOR_LEVELS)
+    return render_html_merged(char_indices, colors, grid.chars, transparent)
+
+
+def grid_thumbnail(grid, columns=THUMBNAIL_COLUMNS, rows=THUMBNAIL_ROWS, max_chars=THUMBNAIL_MAX_CHARS):
+    """Small re-render of a grid for gallery thumbnails, whole rows and at most max_chars
+
+    Keeps every Nth row and column (the same N on both axes, so the aspect ratio
+    holds). Busy colored thumbnails are made coarser until they fit, then fall
+    back to monochrome.
+    """
+    height, width = grid.char_indices.shape
+    step = max(1, math.ceil(width / columns), math.ceil(height / rows))
+    for attempt in range(step, step * 2 + 1):
+        thumbnail = _thumbnail_text(grid, attempt)
+        if len(thumbnail) <= max_chars:
+            return thumbnail
+    return _thumbnail_text(grid._replace(colors=None), step)
@@ -0,0 +1,90 @@
+"""
+Worker Pool Module
+Long-lived conversion processes, each keeping its own ImageProcessor and a warm rembg session
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .image_processor import ImageProcessor, prewarm_rembg
+
+# Per-process ImageProcessor used by pool workers
+_worker_processor = None
+
+
+def init_worker(prewarm=False):
+    """Pool initializer: create the process's ImageProcessor and optionally load rembg"""
+    global _worker_processor
+    _worker_processor = ImageProcessor()
+    if prewarm:
+        prewarm_rembg()
+
+
+def worker_processor():
+    """The per-process ImageProcessor (created on first use outside a pool)"""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = ImageProcessor()
+    return _worker_processor
+
+
+def spawn_executor(workers, prewarm=False):
+    """ProcessPoolExecutor whose workers are started with 'spawn' and run init_worker
+
+    Forking would copy the parent's threads (command loop, scheduler) and any
+    half-initialized onnxruntime state into the children.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+        initargs=(prewarm,)
+    )
+
+
+def _worker_pid(_):
+    """No-op job used to make the pool spawn its processes"""
+    return os.getpid()
+
+
+class WorkerPool:
+    """Process pool shared by GIF frame and batch conversions for the life of the backend
+
+    Workers are started with 'spawn' (see spawn_executor).
+    """
+
+    def __init__(self, workers=None, prewarm_rembg=False):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.prewarm_rembg = prewarm_rembg
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        """The underlying ProcessPoolExecutor, created on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = spawn_executor(self.workers, self.prewarm_rembg)
+            return self._executor
+
+    @property
+    def started(self):
+        """Whether worker processes have been created"""
+        return self._executor is not None
+
+    def stats(self):
+        """Pool size and state for cache_stats"""
+        return {'workers': self.workers, 'started': self.started, 'prewarmRembg': self.prewarm_rembg}
+
+    def start(self):
+        """Start every worker now (in the background) instead of on the first request"""
+        return [self.executor.submit(_worker_pid, i) for i in range(self.workers)]
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -2,9 +2,21 @@ import sys
 import json
 import os
 import traceback
-from core.image_processor import ImageProcessor
+import multiprocessing
+import threading
+from core.batch import collect_inputs, run_batch
+from core.cancellation import CancelledError, raise_if_cancelled
+from core.image_processor import ImageProcessor, prewarm_rembg
+from core.animation_source import is_animated
 from core.gif_processor import GifProcessor
+from core.metrics import ConversionMetrics, StageStats, measure
 from core.file_handler import FileHandler
+from core.frame_delta import pack_frames, row_delta
+from core.result_cache import ResultCache
+from core.scheduler import JOB_BATCH, ConversionScheduler
+from core.stage_cache import StageCache
+from core.wire_format import grid_thumbnail
+from core.worker_pool import WorkerPool
 
 
 def log_error(message):
@@ -19,30 +31,355 @@ def log_info(message):
     sys.stderr.flush()
 
 
+# Responses come from both the command loop and the conversion worker
+_stdout_lock = threading.Lock()
+
+
+def send_message(message):
+    """Write one JSON message line to stdout for Electron"""
+    line = json.dumps(message)
+    with _stdout_lock:
+        print(line)
+        sys.stdout.flush()
+
+
+def send_response(response, request_id=None):
+    """Tag a command response with its request id and send it"""
+    # Tag the response so the UI can match it to its request
+    if request_id is not None:
+        response["requestId"] = request_id
+    
+    # Send JSON back to Electron
+    log_info(f"Sending response: {response.get('status', 'unknown')}")
+    send_message(response)
+
+
+def handle_convert(data, image_processor, gif_processor, file_handler, result_cache, cancel_token=None,
+                   stage_stats=None):
+    """Run one convert command and return its response (GIF frames may be streamed first)
+
+    Stage wall times always go to stage_stats; with "metrics": true the response
+    also carries them (plus peak memory per stage) under "metrics".
+    """
+    request_id = data.get('requestId')
+    response = {}
+    want_metrics = data.get('metrics', False)
+    metrics = ConversionMetrics(trace_memory=want_metrics)
+    try:
+        path = data.get('path')
+        options = data.get('options', {})
+        # Compact mode: ascii/frames are packed wire_format grids, HTML is built by the consumer
+        encoding = 'compact' if options.get('compact', False) else None
+        # GIF payloads: repeated frames by index, near-identical ones as changed rows (text only)
+        dedupe = options.get('dedupe', False)
+        delta = options.get('deltaRows', False) and encoding is None
+
+        log_info(f"Convert command - Path: {path}")
+        log_info(f"Options: {options}")
+
+        if not path:
+            log_error("No path provided")
+            response = {"status": "error", "error": "No file path provided"}
+        elif not os.path.exists(path):
+            log_error(f"File does not exist: {path}")
+            response = {"status": "error", "error": f"File not found: {path}"}
+        else:
+            # Check if animated (GIF, animated WebP/APNG, image-sequence directory) or image
+            animated = is_animated(path)
+            log_info(f"Animated: {animated}")
+
+            # Same file + same options -> reuse the previous result
+            with measure(metrics, 'cache_lookup'):
+                cache_key = result_cache.make_key(path, options)
+                cached = result_cache.get(cache_key)
+            if cached is not None:
+                log_info("Result cache hit")
+
+            if animated and data.get('stream', False):
+                log_info("Processing as GIF (streaming frames)")
+                frames = []
+                delays = []
+                first_index = {}  # frame -> index it was first sent at (dedupe)
+                if cached is not None:
+                    frame_source = zip(cached['frames'], cached['delays'])
+                else:
+                    frame_source = gif_processor.iter_ascii_frames(path, options, cancel_token, metrics)
+                for index, (frame, delay) in enumerate(frame_source):
+                    if cached is not None:
+                        raise_if_cancelled(cancel_token)
+                    # Send each frame as soon as it is ready so playback can start early
+                    message = {
+                        "status": "success",
+                        "type": "gif-frame",
+                        "requestId": request_id,
+                        "index": index,
+                        "delay": delay,
+                        "encoding": encoding
+                    }
+                    rows = row_delta(frames[-1], frame) if delta and frames else None
+                    if dedupe and frame in first_index:
+                        message["repeat"] = first_index[frame]
+                    elif rows is not None:
+                        message["delta"] = {"base": index - 1, "rows": rows}
+                    else:
+                        message["frame"] = frame
+                    if dedupe:
+                        first_index.setdefault(frame, index)
+                    frames.append(frame)
+                    delays.append(delay)
+                    with measure(metrics, 'send'):
+                        send_message(message)
+
+                raise_if_cancelled(cancel_token)
+                thumbnail = cached['thumbnail'] if cached is not None else gif_processor.thumbnail
+                if cached is None and frames:
+                    result_cache.put(cache_key, {'frames': frames, 'delays': delays, 'thumbnail': thumbnail})
+
+                # Save to history with all GIF data
+                if frames:
+                    file_handler.save_history_entry(
+                        frames[0],  # First frame as preview
+                        options,
+                        is_gif=True,
+                        frames=frames,
+                        delays=delays,
+                        encoding=encoding,
+                        thumbnail=thumbnail,
+                        metrics=metrics
+                    )
+
+                # Final summary: frames were already sent individually
+                response = {
+                    "status": "success",
+                    "type": "gif-complete",
+                    "delays": delays,
+                    "frameCount": len(frames),
+                    "cached": cached is not None
+                }
+                mask_stats = gif_processor.mask_stats() if cached is None else None
+                if mask_stats:
+                    response["maskStats"] = mask_stats
+                if dedupe:
+                    response["uniqueFrames"] = len(first_index)
+                log_info(f"GIF streamed successfully, {len(frames)} frames")
+            elif animated:
+                log_info("Processing as GIF")
+                result = cached
+                mask_stats = None
+                duplicate_frames = None
+                if result is None:
+                    converted = gif_processor.process_and_convert(path, options, cancel_token, metrics)
+                    mask_stats = converted['mask_stats']
+                    duplicate_frames = converted['duplicate_frames']
+                    result = {
+                        'frames': converted['frames'],
+                        'delays': converted['delays'],
+                        'thumbnail': converted['thumbnail']
+                    }
+                    if result['frames']:
+                        result_cache.put(cache_key, result)
+
+                # Save to history with all GIF data
+                if result['frames']:
+                    file_handler.save_history_entry(
+                        result['frames'][0],  # First frame as preview
+                        options,
+                        is_gif=True,
+                        frames=result['frames'],
+                        delays=result['delays'],
+                        encoding=encoding,
+                        thumbnail=result['thumbnail'],
+                        metrics=metrics
+                    )
+
+                response = {
+                    "status": "success",
+                    "type": "gif-result",
+                    "frames": result['frames'],
+                    "delays": result['delays'],
+                    "frameCount": len(result['frames']),
+                    "cached": cached is not None
+                }
+                if mask_stats:
+                    response["maskStats"] = mask_stats
+                if dedupe or delta:
+                    # frames become the unique frames; frameIndex maps every frame to one of them
+                    response.update(pack_frames(result['frames'], delta))
+                    if delta:
+                        response["frameEncoding"] = "delta"
+                if dedupe and duplicate_frames is not None:
+                    response["duplicateFrames"] = duplicate_frames
+                log_info(f"GIF processed successfully, {len(result['frames'])} frames")
+            else:
+                log_info("Processing as image")
+                result = cached
+                if result is None and data.get('progressive', False):
+                    # Quick monochrome preview first; the full result follows under the same requestId
+                    with measure(metrics, 'preview'):
+                        preview = image_processor.quick_preview(path, options)
+                    send_message({
+                        "status": "success",
+                        "type": "ascii-preview",
+                        "requestId": request_id,
+                        "ascii": preview
+                    })
+                    raise_if_cancelled(cancel_token)
+                if result is None:
+                    ascii_art = image_processor.process_and_convert(path, options, cancel_token, metrics)
+                    result = {'ascii': ascii_art, 'thumbnail': grid_thumbnail(image_processor.last_grid)}
+                    if ascii_art:
+                        result_cache.put(cache_key, result)
+                ascii_art = result['ascii']
+                log_info(f"ASCII art generated, length: {len(ascii_art) if ascii_art else 0}")
+
+                # Save to history
+                if ascii_art:
+                    file_handler.save_history_entry(
+                        ascii_art, options, encoding=encoding, thumbnail=result['thumbnail'], metrics=metrics
+                    )
+
+                response = {
+                    "status": "success",
+                    "type": "ascii-result",
+                    "ascii": ascii_art,
+                    "isGif": False,
+                    "cached": cached is not None,
+                    "startStage": 'cached' if cached is not None else image_processor.last_start_stage
+                }
+            
+            if encoding:
+                response["encoding"] = encoding
+            
+            if want_metrics:
+                # The final response is serialized again by send_response; time a dry run
+                with measure(metrics, 'serialize'):
+                    json.dumps(response)
+                response["metrics"] = metrics.as_dict()
+            if stage_stats is not None and response.get("status") == "success":
+                stage_stats.record(metrics)
+
+    except CancelledError:
+        # Reported by the scheduler as a "cancelled" response
+        log_info(f"Convert request {request_id} cancelled")
+        raise
+    except Exception as e:
+        error_msg = f"Conversion failed: {str(e)}"
+        log_error(error_msg)
+        log_error(traceback.format_exc())
+        response = {
+            "status": "error",
+            "error": error_msg
+        }
+    finally:
+        # Stops memory tracing if this request started it
+        metrics.finish()
+    
+    return response
+
+
+def handle_convert_batch(data, file_handler, cancel_token=None, pool=None):
+    """Run one convert_batch command, streaming batch-progress messages, and return its summary"""
+    request_id = data.get('requestId')
+    try:
+        source = data.get('source')
+        paths = data.get('paths') or (collect_inputs(source, data.get('recursive', False)) if source else [])
+        output_format = data.get('format', 'txt')
+        output_dir = data.get('outputDir') or os.path.join(file_handler.output_dir, 'batch')
+        log_info(f"Batch convert - {len(paths)} files from {source or 'path list'} to {output_dir}")
+        
+        if not paths:
+            return {"status": "error", "error": "No images to convert"}
+        
+        def progress(done, total, path, error):
+            send_message({
+                "status": "success",
+                "type": "batch-progress",
+                "requestId": request_id,
+                "done": done,
+                "total": total,
+                "path": path,
+                "error": error
+            })
+        
+        summary = run_batch(
+            paths, data.get('options', {}), FileHandler(output_dir), output_format,
+            data.get('workers'), cancel_token, on_result=progress,
+            pool=pool if not data.get('workers') else None
+        )
+        log_info(f"Batch done: {summary['converted']}/{summary['files']} at {summary['filesPerSecond']:.1f} files/s")
+        return {"status": "success", "type": "batch-result", **summary}
+    
+    except CancelledError:
+        raise
+    except Exception as e:
+        error_msg = f"Batch conversion failed: {str(e)}"
+        log_error(error_msg)
+        log_error(traceback.format_exc())
+        return {"status": "error", "error": error_msg}
+
+
 def main():
     log_info("Python backend started")
     
     # Initialize processors
     try:
-        image_processor = ImageProcessor()
-        gif_processor = GifProcessor()
+        # Stage cache lets slider tweaks skip decode and background removal
+        stage_cache = StageCache()
+        image_processor = ImageProcessor(stage_cache=stage_cache)
+        # Set ASCART_PREWARM_REMBG=1 to load the rembg model before the first request
+        prewarm = os.environ.get('ASCART_PREWARM_REMBG') == '1'
+        # Set ASCART_WORKER_POOL=<n> (or 1 for CPU count) to keep n conversion processes alive
+        pool_size = int(os.environ.get('ASCART_WORKER_POOL') or 0)
+        worker_pool = WorkerPool(pool_size if pool_size > 1 else None, prewarm_rembg=prewarm) if pool_size else None
+        gif_processor = GifProcessor(pool=worker_pool)
         file_handler = FileHandler()
+        # Set ASCART_PERSIST_CACHE=1 to keep converted results across restarts
+        persist_cache = os.environ.get('ASCART_PERSIST_CACHE') == '1'
+        result_cache = ResultCache(
+            persist_dir=os.path.join(file_handler.output_dir, 'cache') if persist_cache else None
+        )
         log_info("Processors initialized successfully")
+        
+        if prewarm:
+            # Model load takes seconds; do it off the command loop
+            def prewarm_job():
+                log_info(f"rembg prewarm {'done' if prewarm_rembg() else 'skipped: rembg not installed'}")
+            threading.Thread(target=prewarm_job, name='rembg-prewarm', daemon=True).start()
+        if worker_pool is not None:
+            worker_pool.start()
+            log_info(f"Worker pool starting with {worker_pool.workers} processes")
     except Exception as e:
         log_error(f"Failed to initialize processors: {str(e)}")
         log_error(traceback.format_exc())
     
+    def report_cancelled(request_id, reason):
+        send_response({"status": "cancelled", "message": "Request cancelled", "reason": reason}, request_id)
+    
+    def report_worker_error(request_id, error):
+        log_error(f"Conversion worker error: {str(error)}")
+        send_response({"status": "error", "error": f"Unexpected error: {str(error)}"}, request_id)
+    
+    # Rolling per-stage timings of every conversion since startup, for the stats command
+    stage_stats = StageStats()
+    
+    # Conversions run on a worker thread so ping/history/stop stay responsive
+    scheduler = ConversionScheduler(on_cancelled=report_cancelled, on_error=report_worker_error)
+    
     while True:
         try:
             # Read input from Electron
             line = sys.stdin.readline()
             if not line:
-                log_info("EOF received, exiting")
+                log_info("EOF received, finishing queued conversions and exiting")
+                scheduler.shutdown(wait=True)
+                if worker_pool is not None:
+                    worker_pool.shutdown()
                 break
             
             log_info(f"Received input: {line.strip()}")
             data = json.loads(line)
             command = data.get('command')
+            request_id = data.get('requestId')
             log_info(f"Command: {command}")
             
             response = {}
@@ -54,76 +391,61 @@ def main():
             
             # Stop processing
             elif command == 'stop':
-                response = {"status": "success", "message": "Processing stopped"}
-                log_info("Stop command received - processing terminated")
-                # Note: Current process will complete, but no new processing will start
+                cancelled = scheduler.cancel_all()
+                response = {"status": "success", "message": "Processing stopped", "cancelled": cancelled}
+                log_info(f"Stop command received - {cancelled} conversion(s) cancelled")
             
-            # Convert image/GIF to ASCII
+            # Convert image/GIF to ASCII (runs on the conversion worker)
             elif command == 'convert':
-                try:
-                    path = data.get('path')
-                    options = data.get('options', {})
-                    
-                    log_info(f"Convert command - Path: {path}")
-                    log_info(f"Options: {options}")
-                    
-                    if not path:
-                        log_error("No path provided")
-                        response = {"status": "error", "error": "No file path provided"}
-                    elif not os.path.exists(path):
-                        log_error(f"File does not exist: {path}")
-                        response = {"status": "error", "error": f"File not found: {path}"}
-                    else:
-                        # Check if GIF or image
-                        file_ext = os.path.splitext(path)[1].lower()
-                        log_info(f"File extension: {file_ext}")
-                        
-                        if file_ext == '.gif':
-                            log_info("Processing as GIF")
-                            result = gif_processor.process_and_convert(path, options)
-                            
-                            # Save to history with all GIF data
-                            if result['frames']:
-                                file_handler.save_history_entry(
-                                    result['frames'][0],  # First frame as preview
-                                    options,
-                                    is_gif=True,
-                                    frames=result['frames'],
-                                    delays=result['delays']
-                                )
-                            
-                            response = {
-                                "status": "success",
-                                "type": "gif-result",
-                                "frames": result['frames'],
-                                "delays": result['delays'],
-                                "frameCount": result['frame_count']
-                            }
-                            log_info(f"GIF processed successfully, {result['frame_count']} frames")
-                        else:
-                            log_info("Processing as image")
-                            ascii_art = image_processor.process_and_convert(path, options)
-                            log_info(f"ASCII art generated, length: {len(ascii_art) if ascii_art else 0}")
-                            
-                            # Save to history
-                            if ascii_art:
-                                file_handler.save_history_entry(ascii_art, options)
-                            
-                            response = {
-                                "status": "success",
-                                "type": "ascii-result",
-                                "ascii": ascii_art,
-                                "isGif": False
-                            }
-                    
-                except Exception as e:
-                    error_msg = f"Conversion failed: {str(e)}"
-                    log_error(error_msg)
-                    log_error(traceback.format_exc())
-                    response = {
-                        "status": "error",
-                        "error": error_msg
-                    }
+                def convert_job(cancel_token, data=data, request_id=request_id):
+                    response = handle_convert(
+                        data, image_processor, gif_processor, file_handler, result_cache, cancel_token, stage_stats
+                    )
+                    send_response(response, request_id)
+                
+                # A newer convert cancels the one in flight unless supersede is false;
+                # queued converts of the same file collapse to the latest options
+                path = data.get('path')
+                scheduler.submit(
+                    request_id,
+                    convert_job,
+                    supersede=data.get('supersede', True),
+                    coalesce_key=os.path.abspath(path) if path else None
+                )
+                log_info(f"Convert request {request_id} scheduled")
+                continue  # The worker sends the response
+            
+            # Convert a directory / glob / list of images to files (runs on the conversion worker)
+            elif command == 'convert_batch':
+                def batch_job(cancel_token, data=data, request_id=request_id):
+                    send_response(handle_convert_batch(data, file_handler, cancel_token, worker_pool), request_id)
+                
+                # Batches queue behind the current conversion instead of cancelling it,
+                # and later converts don't cancel them either; only stop does
+                scheduler.submit(request_id, batch_job, supersede=False, kind=JOB_BATCH)
+                log_info(f"Batch request {request_id} scheduled")
+                continue  # The worker sends the response
+            
+            # Result cache counters
+            elif command == 'cache_stats':
+                response = {
+                    "status": "success",
+                    "cache": result_cache.stats(),
+                    "stageCache": stage_cache.stats(),
+                    "scheduler": scheduler.stats(),
+                    "workerPool": worker_pool.stats() if worker_pool is not None else None
+                }
+                log_info(f"Cache stats: {response['cache']}")
+            
+            # Rolling p50/p95 per conversion stage since startup
+            elif command == 'stats':
+                response = {
+                    "status": "success",
+                    "type": "stats",
+                    "stats": stage_stats.stats(),
+                    "scheduler": scheduler.stats()
+                }
+                log_info(f"Stats: {response['stats']['requests']} conversions")
             
             # Save ASCII art
             elif command == 'save':
@@ -158,26 +480,56 @@ def main():
             # Get history
             elif command == 'get_history':
                 try:
-                    history_file = os.path.join(file_handler.output_dir, 'history.json')
-                    log_info(f"Loading history from {history_file}")
+                    offset = data.get('offset', 0)
+                    limit = data.get('limit')
+                    log_info(f"Loading history (offset {offset}, limit {limit})")
                     
-                    if os.path.exists(history_file):
-                        with open(history_file, 'r', encoding='utf-8') as f:
-                            history = json.load(f)
+                    if data.get('full', False):
+                        # Legacy shape: every entry with full ascii/frames
+                        history = file_handler.load_history()
+                        total = len(history)
+                    else:
+                        # Metadata + preview only; full payloads via get_history_entry
+                        history, total = file_handler.list_history(offset, limit)
+                    
+                    response = {
+                        "status": "success",
+                        "history": history,
+                        "total": total,
+                        "offset": offset
+                    }
+                    log_info(f"History loaded: {len(history)} of {total} entries")
+                        
+                except Exception as e:
+                    error_msg = f"History load failed: {str(e)}"
+                    log_error(error_msg)
+                    response = {
+                        "status": "error",
+                        "error": error_msg
+                    }
+            
+            # Get one full history entry
+            elif command == 'get_history_entry':
+                try:
+                    index = data.get('index')
+                    log_info(f"Loading history entry at index {index}")
+                    
+                    entry = file_handler.get_history_entry(index) if index is not None else None
+                    if entry is None:
                         response = {
-                            "status": "success",
-                            "history": history
+                            "status": "error",
+                            "error": f"Invalid index: {index}"
                         }
-                        log_info(f"History loaded: {len(history)} entries")
+                        log_error(f"Invalid index: {index}")
                     else:
                         response = {
                             "status": "success",
-                            "history": []
+                            "type": "history-entry",
+                            "entry": entry
                         }
-                        log_info("No history file found, returning empty array")
-                        
+                    
                 except Exception as e:
-                    error_msg = f"History load failed: {str(e)}"
+                    error_msg = f"History entry load failed: {str(e)}"
                     log_error(error_msg)
                     response = {
                         "status": "error",
@@ -222,26 +574,23 @@ def main():
                 log_error(f"Unknown command: {command}")
                 response = {"status": "error", "error": f"Unknown command: {command}"}
 
-            # Send JSON back to Electron
-            log_info(f"Sending response: {response.get('status', 'unknown')}")
-            print(json.dumps(response))
-            sys.stdout.flush()
+            send_response(response, request_id)
 
         except json.JSONDecodeError as e:
             error_msg = f"Invalid JSON: {str(e)}"
             log_error(error_msg)
             error_response = {"status": "error", "error": error_msg}
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+            send_message(error_response)
             
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             log_error(error_msg)
             log_error(traceback.format_exc())
             error_response = {"status": "error", "error": error_msg}
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+            send_message(error_response)
 
 
 if __name__ == '__main__':
+    # Required for process pools in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import MainLayout from "./layouts/MainLayout";
 import InputPanel from "./components/Generator/InputPanel";
 import WidthPanel from "./components/Generator/WidthPanel";
@@ -23,6 +23,9 @@ function App() {
   const [gifFrames, setGifFrames] = useState([]);
   const [gifDelays, setGifDelays] = useState([]);
 
+  // Id of the newest convert request; streamed frames from older ones are ignored
+  const latestRequestId = useRef(null);
+
   // Settings State
   const [removeBackground, setRemoveBackground] = useState(false);
   const [width, setWidth] = useState(120);
@@ -121,6 +124,31 @@ function App() {
         setIsLoading(false);
         console.log("State updated, isLoading:", false);
         setDebugInfo(`✅ ASCII loaded: ${data.ascii?.length} chars`);
+      } else if (data.type === "ascii-preview") {
+        if (data.requestId !== latestRequestId.current) return;
+        // Quick low-res preview; the full result replaces it under the same requestId
+        setAsciiArt(data.ascii);
+        setIsGif(false);
+        setDebugInfo(`⚡ Preview shown, rendering full quality...`);
+      } else if (data.type === "gif-frame") {
+        if (data.requestId !== latestRequestId.current) return;
+        if (data.index === 0) {
+          // First frame: start showing the GIF right away
+          setIsGif(true);
+          setGifFrames([data.frame]);
+          setGifDelays([data.delay]);
+          setAsciiArt(data.frame);
+          setIsLoading(false);
+        } else {
+          setGifFrames((frames) => [...frames, data.frame]);
+          setGifDelays((delays) => [...delays, data.delay]);
+        }
+        setDebugInfo(`🎞️ GIF frame ${data.index + 1} received`);
+      } else if (data.type === "gif-complete") {
+        if (data.requestId !== latestRequestId.current) return;
+        setGifDelays(data.delays || []);
+        setIsLoading(false);
+        setDebugInfo(`🎬 GIF loaded: ${data.frameCount} frames`);
       } else if (data.type === "gif-result") {
         console.log("🎬 GIF received:", data.frames?.length, "frames");
         setIsGif(true);
@@ -174,15 +202,23 @@ function App() {
       dither: dither,
       ratio: ratio !== "--" ? ratio : null,
       keepOriginal: keepOriginal,
+      mergeSpans: true,
+      resizeFirst: true,
     };
     console.log("   Path:", path);
     console.log("   Options:", options);
 
     setIsLoading(true);
 
-    // Send command to Python backend
+    const requestId = `${Date.now()}-${Math.random().toString(36).substr(2, 6)}`;
+    latestRequestId.current = requestId;
+
+    // Send command to Python backend (GIF frames are streamed back one by one)
     ipcRenderer.send("to-python", {
       command: "convert",
+      requestId: requestId,
+      stream: true,
+      progressive: true,
       path: path,
       options: options,
     });
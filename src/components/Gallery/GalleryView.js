@@ -2,22 +2,48 @@ import React, { useEffect, useState } from "react";
 
 const { ipcRenderer } = window.require("electron");
 
+// History entries fetched per page (metadata + preview only)
+const PAGE_SIZE = 24;
+
 const GalleryView = ({ onClose, onLoadAscii }) => {
   const [history, setHistory] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [selectedItems, setSelectedItems] = useState([]);
+  const [total, setTotal] = useState(0);
 
-  useEffect(() => {
-    // Request history from Python backend
+  const requestPage = (offset) => {
     ipcRenderer.send("to-python", {
       command: "get_history",
+      offset: offset,
+      limit: PAGE_SIZE,
     });
+  };
+
+  useEffect(() => {
+    // Request first page of history from Python backend
+    requestPage(0);
 
-    // Listen for history response
+    // Listen for history responses
     const handleResponse = (event, data) => {
       if (data.status === "success" && data.history) {
-        setHistory(data.history);
+        setHistory((previous) =>
+          data.offset ? [...previous, ...data.history] : data.history
+        );
+        setTotal(data.total ?? data.history.length);
         setIsLoading(false);
+      } else if (data.type === "history-entry" && data.entry) {
+        // Full payload for the item being loaded
+        const entry = data.entry;
+        if (onLoadAscii) {
+          onLoadAscii(
+            entry.ascii,
+            entry.options,
+            entry.isGif,
+            entry.frames,
+            entry.delays
+          );
+        }
+        onClose();
       }
     };
 
@@ -52,26 +78,27 @@ const GalleryView = ({ onClose, onLoadAscii }) => {
 
   const handleLoadItem = () => {
     if (selectedItems.length === 1 && onLoadAscii) {
-      const item = selectedItems[0];
-      // Pass full item data including GIF frames if available
-      onLoadAscii(
-        item.ascii,
-        item.options,
-        item.isGif,
-        item.frames,
-        item.delays
-      );
+      // Fetch full item data (including GIF frames); the response closes the gallery
+      ipcRenderer.send("to-python", {
+        command: "get_history_entry",
+        index: selectedItems[0].index,
+      });
+      return;
     }
     onClose();
   };
 
+  const handleLoadMore = () => {
+    requestPage(history.length);
+  };
+
   const handleDeleteItems = () => {
     if (selectedItems.length === 0) return;
 
     // Get indices of selected items (sorted in reverse to delete from end)
     const indices = selectedItems
-      .map((item) => history.indexOf(item))
-      .filter((index) => index !== -1)
+      .map((item) => item.index)
+      .filter((index) => index !== undefined)
       .sort((a, b) => b - a);
 
     // Send delete commands for each item
@@ -82,9 +109,15 @@ const GalleryView = ({ onClose, onLoadAscii }) => {
       });
     });
 
-    // Update local state
-    const newHistory = history.filter((item) => !selectedItems.includes(item));
+    // Update local state, shifting indices of entries after the deleted ones
+    const newHistory = history
+      .filter((item) => !selectedItems.includes(item))
+      .map((item) => ({
+        ...item,
+        index: item.index - indices.filter((index) => index < item.index).length,
+      }));
     setHistory(newHistory);
+    setTotal(total - indices.length);
     setSelectedItems([]);
   };
 
@@ -148,7 +181,7 @@ const GalleryView = ({ onClose, onLoadAscii }) => {
                   onClick={(e) => handleItemClick(item, e)}
                 >
                   <div className="gallery-item-preview">
-                    <pre dangerouslySetInnerHTML={{ __html: item.ascii }} />
+                    <pre dangerouslySetInnerHTML={{ __html: item.preview }} />
                   </div>
                   <div className="gallery-item-info">
                     <span className="gallery-item-date">
@@ -163,6 +196,14 @@ const GalleryView = ({ onClose, onLoadAscii }) => {
                   )}
                 </div>
               ))}
+              {history.length < total && (
+                <button
+                  className="gallery-btn gallery-btn-load"
+                  onClick={handleLoadMore}
+                >
+                  Load more ({total - history.length})
+                </button>
+              )}
             </div>
           )}
         </div>
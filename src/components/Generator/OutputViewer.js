@@ -14,13 +14,14 @@ const OutputViewer = ({
   const [playbackSpeed, setPlaybackSpeed] = useState(1.0);
   const timerRef = useRef(null);
 
-  // Auto-play GIF when loaded
+  // Auto-play GIF when loaded (frames may keep streaming in afterwards)
+  const hasFrames = gifFrames.length > 0;
   useEffect(() => {
-    if (isGif && gifFrames.length > 0) {
+    if (isGif && hasFrames) {
       setCurrentFrame(0);
       setIsPlaying(true);
     }
-  }, [isGif, gifFrames]);
+  }, [isGif, hasFrames]);
 
   // Animation playback loop
   useEffect(() => {
@@ -42,7 +43,9 @@ const OutputViewer = ({
   };
 
   const displayArt =
-    isGif && gifFrames.length > 0 ? gifFrames[currentFrame] : asciiArt;
+    isGif && gifFrames.length > 0
+      ? gifFrames[currentFrame % gifFrames.length]
+      : asciiArt;
 
   return (
     <div className="panel output-panel">